@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Synthetic benchmark for the Python helpers (brew_categories.py, codex-config-merge.py).
+
+Generates large inputs (a manifest with thousands of rules, 100k brew items,
+deeply nested TOML with thousands of tables), runs each helper with --timings
+and reports per-phase wall time and peak RSS as JSON. Each scenario runs
+--repeat times; the fastest time and the largest RSS per phase are kept.
+
+Baselines live in .context/python-helpers-bench-baseline.json. --check fails
+when a phase exceeds the baseline by more than the tolerances; wall time gets a
+generous factor because machines differ, peak RSS a tighter one because it
+mostly does not. RSS does vary with the Python minor version and the platform
+(VmHWM on Linux, ru_maxrss elsewhere), so --check skips, without running, when
+the baseline was recorded on a different one.
+
+Usage: bench-python-helpers.py [--repeat N] [--write-baseline [FILE] | --check [FILE]]
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+CATEGORY_SCRIPT = SCRIPT_DIR / "lib" / "brew_categories.py"
+MERGE_SCRIPT = SCRIPT_DIR / "codex-config-merge.py"
+DEFAULT_BASELINE = SCRIPT_DIR.parent / ".context" / "python-helpers-bench-baseline.json"
+
+# Input sizes; changing them invalidates the recorded baseline
+SCALE = {
+    "categories": 400,
+    "exact_per_category": 4,
+    "prefix_per_category": 3,
+    "regex_every": 10,
+    "regex_per_category": 3,
+    "items": 100_000,
+    "toml_tables": 3000,
+    "toml_depth": 6,
+}
+SEED = 20260701
+
+TIME_FACTOR = 3.0
+TIME_SLACK_SECONDS = 0.05
+MEMORY_FACTOR = 1.25
+MEMORY_SLACK_BYTES = 8 << 20
+
+
+def build_manifest(rng: random.Random) -> dict[str, Any]:
+    """Categories in the shape of brew/categories.json: mostly exact names and prefixes, some regexes."""
+    categories = []
+    for idx in range(SCALE["categories"]):
+        stem = f"cat{idx:03d}"
+        match = {
+            "exact": [f"{stem}-tool{n}" for n in range(SCALE["exact_per_category"])],
+            "prefix": [f"{stem}-lib{n}" for n in range(SCALE["prefix_per_category"])],
+        }
+        if idx % SCALE["regex_every"] == 0:
+            match["regex"] = [f"^{stem}-(?:svc|daemon){n}[a-z]*$" for n in range(SCALE["regex_per_category"])]
+        categories.append({"id": stem, "title": f"Category {idx}", "match": match})
+    rng.shuffle(categories)
+    return {"formulae": categories, "casks": categories[: SCALE["categories"] // 4]}
+
+
+def build_items(rng: random.Random) -> list[str]:
+    """Mostly matching items, with a share that falls through every rule to Uncategorized."""
+    kinds = ("tool", "lib", "svc", "daemon", "misc")
+    return [
+        f"cat{rng.randrange(SCALE['categories']):03d}-{rng.choice(kinds)}{rng.randrange(4)}{'x' * rng.randrange(3)}"
+        for _ in range(SCALE["items"])
+    ]
+
+
+def _table_path(rng: random.Random, idx: int) -> list[str]:
+    depth = 1 + idx % SCALE["toml_depth"]
+    return [f"t{rng.randrange(8)}" for _ in range(depth - 1)] + [f"leaf{idx}"]
+
+
+def build_toml(rng: random.Random, local: bool) -> str:
+    """Nested tables; the local side shares most of them with the base but drifts in values and extras."""
+    lines = []
+    for idx in range(SCALE["toml_tables"]):
+        path = _table_path(random.Random(idx), idx)
+        if local and idx % 5 == 0:
+            continue
+        lines.append(f"[{'.'.join(path)}]")
+        lines.append(f'name = "table {idx}"')
+        lines.append(f"enabled = {'true' if (idx % 2 == 0) != (local and idx % 7 == 0) else 'false'}")
+        lines.append(f"weights = [{', '.join(str(rng.randrange(100)) for _ in range(4))}]")
+        if local:
+            lines.append(f'local_only = "kept {idx}"  # terminal state')
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _run(cmd: list[str], stdin: str | None = None) -> dict[str, Any]:
+    result = subprocess.run(cmd, input=stdin, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise SystemExit(f"{' '.join(cmd)} failed ({result.returncode}): {result.stderr.strip()}")
+    # The timings report is the last stderr line
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def run_scenarios(work_dir: Path) -> dict[str, list[dict[str, Any]]]:
+    rng = random.Random(SEED)
+    manifest = work_dir / "categories.json"
+    manifest.write_text(json.dumps(build_manifest(rng)))
+    items = "\n".join(build_items(rng)) + "\n"
+    base = work_dir / "base.toml"
+    base.write_text(build_toml(rng, local=False))
+    local_text = build_toml(rng, local=True)
+
+    category_cmd = [sys.executable, str(CATEGORY_SCRIPT), "--manifest", str(manifest), "--type", "formulae", "--timings"]
+    fresh = work_dir / "fresh.toml"
+    patched = work_dir / "patched.toml"
+    patched.write_text(local_text)
+
+    return {
+        "categorize-human": [_run([*category_cmd, "--no-cache", "--label-uncategorized"], items)],
+        "categorize-jsonl": [_run([*category_cmd, "--no-cache", "--format", "jsonl"], items)],
+        "merge-fresh": [_run([sys.executable, str(MERGE_SCRIPT), "--timings", str(base), str(fresh)])],
+        "merge-patch": [_run([sys.executable, str(MERGE_SCRIPT), "--timings", str(base), str(patched)])],
+    }
+
+
+def summarize(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    phases: dict[str, dict[str, Any]] = {}
+    for report in runs:
+        for name, phase in report["phases"].items():
+            entry = phases.setdefault(name, dict(phase))
+            entry["seconds"] = min(entry["seconds"], phase["seconds"])
+            entry["max_rss_bytes"] = max(entry["max_rss_bytes"], phase["max_rss_bytes"])
+    return {
+        "phases": {name: {"seconds": round(p["seconds"], 4), "max_rss_bytes": p["max_rss_bytes"]} for name, p in phases.items()},
+        "total_seconds": round(min(report["total_seconds"] for report in runs), 4),
+    }
+
+
+def benchmark(repeat: int) -> dict[str, Any]:
+    runs: dict[str, list[dict[str, Any]]] = {}
+    for _ in range(repeat):
+        # A fresh directory per round so every merge starts without a stamp
+        with tempfile.TemporaryDirectory(prefix="bench-python-helpers-") as tmp:
+            for name, reports in run_scenarios(Path(tmp)).items():
+                runs.setdefault(name, []).extend(reports)
+    return {
+        "generated": date.today().isoformat(),
+        "tool": "script/bench-python-helpers.py",
+        "python": python_version(),
+        "platform": sys.platform,
+        "scale": SCALE,
+        "scenarios": {name: summarize(reports) for name, reports in runs.items()},
+    }
+
+
+def python_version() -> str:
+    return f"{sys.version_info.major}.{sys.version_info.minor}"
+
+
+def environment_mismatch(baseline: dict[str, Any]) -> str | None:
+    """Why the baseline cannot be compared on this interpreter, or None if it can."""
+    recorded = (baseline.get("platform"), baseline.get("python"))
+    current = (sys.platform, python_version())
+    if recorded == current:
+        return None
+    return (
+        f"baseline was recorded on {recorded[0]} / Python {recorded[1]}, this is {current[0]} / Python {current[1]}; "
+        "re-record it here with --write-baseline to compare"
+    )
+
+
+def compare(result: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """Regressions of result against baseline, one message per phase over tolerance."""
+    if baseline.get("scale") != result["scale"]:
+        return ["baseline was recorded at a different scale; re-record it with --write-baseline"]
+    regressions = []
+    for name, scenario in baseline["scenarios"].items():
+        current = result["scenarios"].get(name)
+        if current is None:
+            regressions.append(f"{name}: scenario missing")
+            continue
+        for phase, expected in scenario["phases"].items():
+            actual = current["phases"].get(phase)
+            if actual is None:
+                regressions.append(f"{name}.{phase}: phase missing")
+                continue
+            time_limit = expected["seconds"] * TIME_FACTOR + TIME_SLACK_SECONDS
+            if actual["seconds"] > time_limit:
+                regressions.append(f"{name}.{phase}: {actual['seconds']:.3f}s > {time_limit:.3f}s")
+            memory_limit = expected["max_rss_bytes"] * MEMORY_FACTOR + MEMORY_SLACK_BYTES
+            if actual["max_rss_bytes"] > memory_limit:
+                regressions.append(f"{name}.{phase}: RSS {actual['max_rss_bytes']} B > {int(memory_limit)} B")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Python helpers on synthetic inputs")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (default: %(default)s)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--write-baseline", type=Path, nargs="?", const=DEFAULT_BASELINE, help="Record the results as the baseline")
+    mode.add_argument("--check", type=Path, nargs="?", const=DEFAULT_BASELINE, help="Fail when a phase regressed against the baseline")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    baseline = None
+    if args.check:
+        try:
+            baseline = json.loads(args.check.read_text())
+        except (OSError, ValueError) as exc:
+            raise SystemExit(f"Cannot read baseline {args.check}: {exc}") from exc
+        mismatch = environment_mismatch(baseline)
+        if mismatch:
+            print(f"skipped: {mismatch}", file=sys.stderr)
+            return 0
+
+    result = benchmark(args.repeat)
+    print(json.dumps(result, indent=2))
+    if args.write_baseline:
+        args.write_baseline.write_text(json.dumps(result, indent=2) + "\n")
+        return 0
+    if baseline is not None:
+        regressions = compare(result, baseline)
+        for message in regressions:
+            print(f"regression: {message}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
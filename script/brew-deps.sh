@@ -12,6 +12,7 @@ REPO_ROOT="${SCRIPT_DIR:h}"
 BREW_DIR="$REPO_ROOT/brew"
 CATEGORY_MANIFEST="$BREW_DIR/categories.json"
 CATEGORY_SCRIPT="$SCRIPT_DIR/lib/brew_categories.py"
+LEAVES_SCRIPT="$SCRIPT_DIR/lib/brew_leaves.py"
 
 source "$SCRIPT_DIR/lib/output.sh"
 
@@ -53,8 +54,17 @@ get_leaves_with_categories() {
     brew leaves | python3 "$CATEGORY_SCRIPT" --manifest "$CATEGORY_MANIFEST" --type formulae --format human --label-uncategorized
 }
 
+has_leaves_helper() {
+    command -v python3 >/dev/null 2>&1 && [[ -f "$LEAVES_SCRIPT" ]]
+}
+
 get_cask_leaves() {
     # Get all casks that were explicitly installed (not dependencies)
+    # A single brew info JSON dump replaces one `brew uses` launch per cask
+    if has_leaves_helper; then
+        brew info --json=v2 --installed | python3 "$LEAVES_SCRIPT" --type casks
+        return
+    fi
     brew list --cask | while read cask; do
         # Check if this cask is a dependency of another cask
         if ! brew uses --cask --installed "$cask" | grep -q .; then
@@ -68,6 +78,10 @@ get_cask_leaves_with_categories() {
         get_cask_leaves
         return
     fi
+    if [[ -f "$LEAVES_SCRIPT" ]]; then
+        brew info --json=v2 --installed | python3 "$LEAVES_SCRIPT" --type casks --manifest "$CATEGORY_MANIFEST" --format human --label-uncategorized
+        return
+    fi
     get_cask_leaves | python3 "$CATEGORY_SCRIPT" --manifest "$CATEGORY_MANIFEST" --type casks --format human --label-uncategorized
 }
 
@@ -110,6 +124,21 @@ generate_categorized_brewfile() {
         exit 1
     fi
 
+    # Categorize formulae and casks in one helper run (manifest is loaded once)
+    local work_dir
+    work_dir="$(mktemp -d)"
+    # `if !` keeps errexit from exiting before the temporary directory is removed
+    if ! {
+        brew leaves | sed 's/^/formulae /'
+        get_cask_leaves | sed 's/^/casks /'
+    } | python3 "$CATEGORY_SCRIPT" --manifest "$CATEGORY_MANIFEST" --batch \
+        --output "formulae:brew:$work_dir/formulae" \
+        --output "casks:brew:$work_dir/casks"; then
+        rm -rf "$work_dir"
+        print_error "Failed to categorize packages for $output"
+        exit 1
+    fi
+
     {
         echo "# Categorized Homebrew packages without dependencies"
         echo "# Generated on $(date)"
@@ -125,12 +154,13 @@ generate_categorized_brewfile() {
         echo ""
         echo "# === FORMULAE ==="
         echo ""
-        brew leaves | python3 "$CATEGORY_SCRIPT" --manifest "$CATEGORY_MANIFEST" --type formulae --format brew
+        cat "$work_dir/formulae"
         echo "# === CASKS ==="
         echo ""
-        get_cask_leaves | python3 "$CATEGORY_SCRIPT" --manifest "$CATEGORY_MANIFEST" --type casks --format brew
+        cat "$work_dir/casks"
         
     } > "$output"
+    rm -rf "$work_dir"
     
     print_success "Generated $output"
 }
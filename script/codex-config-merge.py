@@ -1,7 +1,7 @@
-#!/usr/bin/env -S uv run --script --quiet
+#!/usr/bin/env python3
 # /// script
 # requires-python = ">=3.11"
-# dependencies = ["tomli-w>=1.0,<2"]
+# dependencies = []
 # ///
 """リポジトリの .codex/config.toml（共有ベース）を端末の config.toml へマージ配備する。
 
@@ -17,19 +17,147 @@ Codex / ChatGPT アプリは projects.*.trust_level・marketplaces.*・プラグ
 配備先が symlink の場合はリンク先の内容をローカル状態として取り込んだうえで
 実ファイルに置き換える（symlink 環境からの自動移行）。
 
-注意: 書き込みは TOML を再シリアライズするため、配備先ファイル内のコメントは
-残らない（ベースのコメントはリポジトリ側に正本がある）。
+書き込みは最小差分パッチで行う。ローカルとマージ結果の差分キーだけを元テキスト上で
+書き換え・追記するため、配備先のコメントや書式は残る。ベース由来の差分が無ければ
+書き込まない。パッチを安全に当てられない構造（テーブル配列の中身の置き換えなど）や、
+パッチ結果がマージ結果と一致しない場合に限り、全体を再シリアライズする
+（その場合コメントは残らない。ベースのコメントはリポジトリ側に正本がある）。
 
-Usage: codex-config-merge.py <base_toml> <target_toml>
+依存は標準ライブラリのみ（Python 3.11+ の python3 でそのまま動く）。TOML の書き出しは
+tomllib が返す型（テーブル・テーブル配列・配列・文字列・数値・真偽値・日時）に限った
+組み込みシリアライザで行い、出力は tomli-w と同一の書式にそろえている。
+
+バッチモードはベースを一度だけパースし、複数の配備先（引数または 1 行 1 パスの
+マニフェスト）をワーカープールで並列にマージして、配備先ごとの結果
+（unchanged / merged / migrated / error）を JSON サマリとして標準出力へ書く。
+1 件の失敗は他の配備先の処理を止めない（いずれか失敗なら終了コード 1）。
+
+高速パス: マージ後に配備先の隣へスタンプ（<target>.merge-stamp）を書き、
+ベース・配備先・出力の SHA-256 を記録する。次回ベースも配備先も変わっていなければ
+TOML を一切パースせずに終了する。配備先が Codex 等に書き換えられていれば
+ハッシュが変わるので通常のマージを行う。
+
+--timings を付けると、フェーズ（stamp / parse / deep_merge / serialize / write）ごとの
+経過時間と、そのフェーズ終了時点のプロセス最大常駐メモリ（RSS）を JSON で標準エラーへ
+書く。バッチモードの経過時間は全配備先の合計（並列実行中の分は重なり合う）になる。
+
+Usage: codex-config-merge.py [--timings] <base_toml> <target_toml>
+       codex-config-merge.py --batch <base_toml> [--targets-file FILE] [--jobs N] [--timings] [target_toml ...]
 """
 
+from __future__ import annotations
+
+import hashlib
+import json
 import os
 import sys
-import tomllib
+from contextlib import contextmanager, suppress
 from pathlib import Path
-from typing import Any
+from time import perf_counter
+
+# 変更なしの高速パス（スタンプ照合）はハッシュ計算だけで済み、インタプリタ起動と
+# スクリプトのコンパイル・import が実行時間の大半を占める。tomllib・argparse・
+# concurrent.futures など高速パスで使わないモジュールは、実際にパース・マージする経路で
+# import する。型注釈用の typing も実行時には読まない。
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import re
+    import tomllib
+    from datetime import date, datetime, time
+    from typing import Any, Iterator
+
+STAMP_SUFFIX = ".merge-stamp"
+STAMP_FORMAT = 1
+
+# tomli-w 互換の書式パラメータ
+_INDENT = "    "
+_MAX_INLINE_TABLE_LINE = 100
+_BARE_KEY_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_")
+_COMPACT_ESCAPES = {"\b": "\\b", "\n": "\\n", "\f": "\\f", "\r": "\\r", '"': '\\"', "\\": "\\\\"}
+_ESCAPED_CHARS = frozenset(chr(i) for i in range(32) if chr(i) != "\t") | frozenset('"\\\x7f')
+
+
+def _escape_char(char: str) -> str:
+    if char not in _ESCAPED_CHARS:
+        return char
+    return _COMPACT_ESCAPES.get(char) or f"\\u{ord(char):04x}"
+
+
+def _format_string(value: str) -> str:
+    if _ESCAPED_CHARS.isdisjoint(value):
+        return f'"{value}"'
+    return '"' + "".join(_escape_char(char) for char in value) + '"'
+
+
+def _format_key(key: str) -> str:
+    return key if key and _BARE_KEY_CHARS.issuperset(key) else _format_string(key)
+
+
+def _format_value(value: Any, nest_level: int = 0) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, date, datetime)):
+        return str(value)
+    if isinstance(value, time):
+        if value.tzinfo:
+            raise ValueError("TOML はオフセット付きの時刻を表せません")
+        return str(value)
+    if isinstance(value, str):
+        return _format_string(value)
+    if isinstance(value, list):
+        if not value:
+            return "[]"
+        item_indent = _INDENT * (nest_level + 1)
+        items = ",\n".join(item_indent + _format_value(item, nest_level + 1) for item in value)
+        return f"[\n{items},\n{_INDENT * nest_level}]"
+    if isinstance(value, dict):
+        return _format_inline_table(value)
+    raise TypeError(f"TOML に書き出せない型です: {type(value).__qualname__}")
+
 
-import tomli_w
+def _format_inline_table(table: dict[str, Any]) -> str:
+    if not table:
+        return "{}"
+    return "{ " + ", ".join(f"{_format_key(k)} = {_format_value(v)}" for k, v in table.items()) + " }"
+
+
+def _fits_inline(table: dict[str, Any]) -> bool:
+    rendered = f"{_INDENT}{_format_inline_table(table)},"
+    return len(rendered) <= _MAX_INLINE_TABLE_LINE and "\n" not in rendered
+
+
+def _is_table_array(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(item, dict) for item in value)
+
+
+def _table_chunks(table: dict[str, Any], name: str, in_array: bool = False) -> list[str]:
+    scalars: list[tuple[str, Any]] = []
+    children: list[tuple[str, dict[str, Any], bool]] = []
+    for key, value in table.items():
+        if isinstance(value, dict):
+            children.append((key, value, False))
+        elif _is_table_array(value) and not all(_fits_inline(item) for item in value):
+            children.extend((key, item, True) for item in value)
+        else:
+            scalars.append((key, value))
+
+    chunks: list[str] = []
+    # 子テーブルだけを持つ中間テーブルはヘッダを省く（[a.b] だけで [a] は暗黙に定義される）
+    if in_array or (name and (scalars or not children)):
+        chunks.append(f"[[{name}]]\n" if in_array else f"[{name}]\n")
+    chunks.extend(f"{_format_key(key)} = {_format_value(value)}\n" for key, value in scalars)
+    for key, child, child_in_array in children:
+        if chunks:
+            chunks.append("\n")
+        child_name = f"{name}.{_format_key(key)}" if name else _format_key(key)
+        chunks.extend(_table_chunks(child, child_name, child_in_array))
+    return chunks
+
+
+def dumps_toml(data: dict[str, Any]) -> str:
+    """tomllib.loads の結果を TOML 文字列に戻す（tomli_w.dumps と同じ出力）。"""
+    _import_merge_modules()
+    return "".join(_table_chunks(data, ""))
 
 
 def deep_merge(local: Any, base: Any) -> Any:
@@ -42,45 +170,552 @@ def deep_merge(local: Any, base: Any) -> Any:
     return base
 
 
-def main() -> int:
-    if len(sys.argv) != 3:
-        print(f"Usage: {Path(sys.argv[0]).name} <base_toml> <target_toml>", file=sys.stderr)
-        return 2
+class PatchError(Exception):
+    """差分パッチを安全に当てられない（全体の再シリアライズにフォールバックする）。"""
+
+
+_BARE_KEY_PATTERN = r"[A-Za-z0-9_-]+"
+# _import_merge_modules() が初回に compile する（高速パスでは re を読まない）
+_BARE_KEY_RE: re.Pattern[str] | None = None
+
+
+def _import_merge_modules() -> None:
+    """マージ経路で使うモジュールを初回だけ import し、モジュール変数へ束縛する。
+
+    値ごと・キーごとに呼ばれる _format_value・_parse_key に関数内 import を置くと
+    呼び出しのたびに import 文が走るため、パース・シリアライズの入口でここを呼ぶ。
+    """
+    global _BARE_KEY_RE, tomllib, date, datetime, time
+    if _BARE_KEY_RE is not None:
+        return
+    import re
+    import tomllib
+    from datetime import date, datetime, time
 
-    base_path = Path(sys.argv[1])
-    target_path = Path(sys.argv[2])
+    _BARE_KEY_RE = re.compile(_BARE_KEY_PATTERN)
 
+
+def same_value(a: Any, b: Any) -> bool:
+    """型まで含めて比較する（== では 1 と true、1 と 1.0 が等しくなってしまう）。"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_value(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same_value(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def changed_paths(local: dict[str, Any], merged: dict[str, Any], prefix: tuple[str, ...] = ()) -> list[tuple[str, ...]]:
+    """merged が local と異なるキーパス（追加・値の変更）を列挙する。マージは削除をしない。"""
+    changes = []
+    for key, value in merged.items():
+        path = (*prefix, key)
+        if key in local and isinstance(value, dict) and isinstance(local[key], dict):
+            changes.extend(changed_paths(local[key], value, path))
+        elif key not in local or not same_value(local[key], value):
+            changes.append(path)
+    return changes
+
+
+def _lookup(data: dict[str, Any], path: tuple[str, ...]) -> Any:
+    for key in path:
+        data = data[key]
+    return data
+
+
+def _table_name(path: tuple[str, ...]) -> str:
+    return ".".join(_format_key(key) for key in path)
+
+
+def _skip_spaces(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in " \t":
+        pos += 1
+    return pos
+
+
+def _skip_blank(text: str, pos: int) -> int:
+    """空白・空行・コメントを読み飛ばす。"""
+    while pos < len(text):
+        if text[pos] in " \t\r\n":
+            pos += 1
+        elif text[pos] == "#":
+            newline = text.find("\n", pos)
+            pos = len(text) if newline < 0 else newline + 1
+        else:
+            break
+    return pos
+
+
+def _line_end(text: str, pos: int) -> int:
+    """値やヘッダの後ろ（空白・コメント）を読み飛ばし、次の行頭を返す。"""
+    pos = _skip_spaces(text, pos)
+    if text.startswith("#", pos):
+        pos = text.find("\n", pos)
+        pos = len(text) if pos < 0 else pos
+    if text.startswith("\r\n", pos):
+        return pos + 2
+    if text.startswith("\n", pos) or pos == len(text):
+        return min(pos + 1, len(text))
+    raise PatchError(f"行末に想定外の文字があります（{pos} 文字目）")
+
+
+def _string_end(text: str, pos: int) -> int:
+    quote = text[pos]
+    if text.startswith(quote * 3, pos):
+        i = pos + 3
+        while i < len(text):
+            if quote == '"' and text[i] == "\\":
+                i += 2
+            elif text.startswith(quote * 3, i):
+                # 終端直前の引用符（最大 2 個）は文字列の中身に含まれる
+                end = i + 3
+                while end < len(text) and text[end] == quote and end - i < 5:
+                    end += 1
+                return end
+            else:
+                i += 1
+    else:
+        i = pos + 1
+        while i < len(text) and text[i] != "\n":
+            if quote == '"' and text[i] == "\\":
+                i += 2
+            elif text[i] == quote:
+                return i + 1
+            else:
+                i += 1
+    raise PatchError(f"文字列が閉じていません（{pos} 文字目）")
+
+
+def _value_end(text: str, pos: int) -> int:
+    char = text[pos : pos + 1]
+    if char in ('"', "'"):
+        return _string_end(text, pos)
+    if char in ("[", "{"):
+        depth = 0
+        i = pos
+        while i < len(text):
+            if text[i] in "\"'":
+                i = _string_end(text, i)
+                continue
+            if text[i] == "#":
+                i = text.find("\n", i)
+                if i < 0:
+                    break
+                continue
+            if text[i] in "[{":
+                depth += 1
+            elif text[i] in "]}":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+        raise PatchError(f"配列またはインラインテーブルが閉じていません（{pos} 文字目）")
+    # 数値・真偽値・日時（日時は空白区切りもあり得るので行末かコメントまで）
+    end = text.find("\n", pos)
+    end = len(text) if end < 0 else end
+    comment = text.find("#", pos, end)
+    value = text[pos : end if comment < 0 else comment].rstrip()
+    if not value:
+        raise PatchError(f"値がありません（{pos} 文字目）")
+    return pos + len(value)
+
+
+def _parse_key(text: str, pos: int) -> tuple[tuple[str, ...], int]:
+    parts = []
+    while True:
+        pos = _skip_spaces(text, pos)
+        if text[pos : pos + 1] in ('"', "'"):
+            end = _string_end(text, pos)
+            parts.append(tomllib.loads(f"k = {text[pos:end]}")["k"])
+            pos = end
+        else:
+            match = _BARE_KEY_RE.match(text, pos)
+            if not match:
+                raise PatchError(f"キーを解釈できません（{pos} 文字目）")
+            parts.append(match.group())
+            pos = match.end()
+        pos = _skip_spaces(text, pos)
+        if not text.startswith(".", pos):
+            return tuple(parts), pos
+        pos += 1
+
+
+def scan_layout(text: str) -> tuple[dict[tuple[str, ...], tuple[int, int]], dict[tuple[str, ...], int]]:
+    """TOML テキスト中の位置情報を集める。
+
+    戻り値は (キーパス → 値の span, ヘッダで明示されたテーブル → 最後の key/value 行の直後)。
+    ルートテーブルは () で表す。[[テーブル配列]] 内のキーはパスで指せないため記録しない。
+    """
+    _import_merge_modules()
+    entries: dict[tuple[str, ...], tuple[int, int]] = {}
+    section_ends: dict[tuple[str, ...], int] = {(): 0}
+    table: tuple[str, ...] = ()
+    addressable = True
+    pos = _skip_blank(text, 0)
+    while pos < len(text):
+        if text[pos] == "[":
+            is_array = text.startswith("[[", pos)
+            table, pos = _parse_key(text, pos + (2 if is_array else 1))
+            closing = "]]" if is_array else "]"
+            if not text.startswith(closing, pos):
+                raise PatchError(f"テーブルヘッダが閉じていません（{pos} 文字目）")
+            pos = _line_end(text, pos + len(closing))
+            addressable = not is_array
+            if addressable:
+                section_ends[table] = pos
+        else:
+            key, pos = _parse_key(text, pos)
+            if not text.startswith("=", pos):
+                raise PatchError(f"'=' がありません（{pos} 文字目）")
+            value_start = _skip_spaces(text, pos + 1)
+            value_end = _value_end(text, value_start)
+            pos = _line_end(text, value_end)
+            if addressable:
+                entries[table + key] = (value_start, value_end)
+                section_ends[table] = pos
+        pos = _skip_blank(text, pos)
+    return entries, section_ends
+
+
+def patch_toml(text: str, local: dict[str, Any], merged: dict[str, Any]) -> str:
+    """text（local のパース元）を merged と一致するよう、差分のあるキーだけ書き換える。"""
+    entries, section_ends = scan_layout(text)
+    edits: list[tuple[int, int, str]] = []
+    replaced: set[tuple[str, ...]] = set()
+    appended: dict[tuple[str, ...], list[str]] = {}
+    new_tables: list[str] = []
+
+    for path in changed_paths(local, merged):
+        # 値が key/value 行（インラインテーブル・ドット付きキーを含む）にあれば、その値だけを置き換える
+        owner = next((path[:i] for i in range(1, len(path) + 1) if path[:i] in entries), None)
+        if owner is not None:
+            if owner not in replaced:
+                replaced.add(owner)
+                start, end = entries[owner]
+                edits.append((start, end, _format_value(_lookup(merged, owner))))
+            continue
+
+        parent, key = path[:-1], path[-1]
+        if key in _lookup(local, parent):
+            # テーブルヘッダや [[テーブル配列]] で書かれた値の置き換えは行単位では扱えない
+            raise PatchError(f"{_table_name(path)} はその場で書き換えられません")
+        value = _lookup(merged, path)
+        if isinstance(value, dict):
+            new_tables.append("".join(_table_chunks(value, _table_name(path))))
+            continue
+        if _is_table_array(value) and not all(_fits_inline(item) for item in value):
+            new_tables.extend("".join(_table_chunks(item, _table_name(path), in_array=True)) for item in value)
+            continue
+        line = f"{_format_key(key)} = {_format_value(value)}\n"
+        if parent in section_ends:
+            offset = section_ends[parent]
+            edits.append((offset, offset, line))
+        else:
+            appended.setdefault(parent, []).append(line)
+
+    # 同じ位置への挿入は生成順に並ぶよう、後ろの編集から当てる
+    patched = text
+    for _, (start, end, replacement) in sorted(enumerate(edits), key=lambda e: (e[1][0], e[0]), reverse=True):
+        if start == end and start > 0 and patched[start - 1] != "\n":
+            replacement = "\n" + replacement
+        patched = patched[:start] + replacement + patched[end:]
+
+    tail = [f"[{_table_name(parent)}]\n" + "".join(lines) for parent, lines in appended.items()] + new_tables
+    for chunk in tail:
+        if patched and not patched.endswith("\n"):
+            patched += "\n"
+        patched += ("\n" if patched else "") + chunk
+    return patched
+
+
+def render_merged(text: str, local: dict[str, Any], merged: dict[str, Any]) -> str:
+    """差分パッチを試み、結果が merged と一致しなければ全体を再シリアライズする。"""
+    _import_merge_modules()
     try:
-        base = tomllib.loads(base_path.read_text())
-    except (OSError, tomllib.TOMLDecodeError) as err:
-        print(f"⚠️  ベースを読めません: {base_path}: {err}", file=sys.stderr)
-        return 1
+        patched = patch_toml(text, local, merged)
+        if same_value(tomllib.loads(patched), merged):
+            return patched
+    except (PatchError, tomllib.TOMLDecodeError):
+        pass
+    return dumps_toml(merged)
 
+
+class MergeError(Exception):
+    """配備先 1 件のマージ失敗。メッセージはそのまま利用者に表示する。"""
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BaseConfig:
+    """共有ベース。ハッシュは読み込み時に計算し、TOML パースは必要になるまで遅らせる。"""
+
+    def __init__(self, path: Path, raw: bytes) -> None:
+        self.path = path
+        self.raw = raw
+        self.digest = _digest(raw)
+        self._data: dict[str, Any] | None = None
+
+    def data(self) -> dict[str, Any]:
+        if self._data is None:
+            _import_merge_modules()
+            try:
+                self._data = tomllib.loads(self.raw.decode())
+            except (UnicodeDecodeError, tomllib.TOMLDecodeError) as err:
+                raise MergeError(f"ベースを読めません: {self.path}: {err}") from err
+        return self._data
+
+
+def load_base(base_path: Path) -> BaseConfig:
+    try:
+        return BaseConfig(base_path, base_path.read_bytes())
+    except OSError as err:
+        raise MergeError(f"ベースを読めません: {base_path}: {err}") from err
+
+
+def max_rss_bytes() -> int:
+    """プロセスの最大常駐メモリ（バイト）。"""
+    # Linux の ru_maxrss は exec 前の親プロセスの値を引き継ぐため、このプロセス自身の VmHWM を優先する
+    with suppress(OSError):
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    import resource
+
+    # ru_maxrss は Linux では KiB、macOS ではバイト
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+class PhaseTimings:
+    """--timings 用: フェーズごとの経過時間（合計）と、フェーズ終了時点の最大常駐メモリを集計する。"""
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.phases: dict[str, dict[str, Any]] = {}
+        self._lock = None
+        if enabled:
+            import threading
+
+            self._lock = threading.Lock()
+        self._started = perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            seconds = perf_counter() - started
+            rss = max_rss_bytes()
+            with self._lock:
+                entry = self.phases.setdefault(name, {"seconds": 0.0, "max_rss_bytes": 0, "calls": 0})
+                entry["seconds"] += seconds
+                entry["max_rss_bytes"] = max(entry["max_rss_bytes"], rss)
+                entry["calls"] += 1
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        report = {
+            "tool": "codex-config-merge",
+            "phases": self.phases,
+            "total_seconds": perf_counter() - self._started,
+            "max_rss_bytes": max_rss_bytes(),
+        }
+        print(json.dumps(report), file=sys.stderr)
+
+
+NO_TIMINGS = PhaseTimings(False)
+
+
+def stamp_path(target_path: Path) -> Path:
+    return target_path.with_name(target_path.name + STAMP_SUFFIX)
+
+
+def read_stamp(target_path: Path) -> dict[str, Any]:
+    try:
+        stamp = json.loads(stamp_path(target_path).read_text())
+    except (OSError, ValueError):
+        return {}
+    return stamp if isinstance(stamp, dict) and stamp.get("format") == STAMP_FORMAT else {}
+
+
+def write_stamp(target_path: Path, base: BaseConfig, output: bytes) -> None:
+    digest = _digest(output)
+    stamp = {"format": STAMP_FORMAT, "base": base.digest, "target": digest, "output": digest}
+    # スタンプは高速化のためだけのもの。書けなくても配備自体は成功扱い
+    with suppress(OSError):
+        stamp_path(target_path).write_text(json.dumps(stamp))
+
+
+def is_up_to_date(base: BaseConfig, target_path: Path) -> bool:
+    """前回マージ以降ベースも配備先も変わっていなければ True（TOML はパースしない）。"""
+    if target_path.is_symlink():
+        return False
+    stamp = read_stamp(target_path)
+    if stamp.get("base") != base.digest:
+        return False
+    try:
+        return stamp.get("target") == _digest(target_path.read_bytes())
+    except OSError:
+        return False
+
+
+def merge_into(base: BaseConfig, target_path: Path, timings: PhaseTimings = NO_TIMINGS) -> str:
+    """base を target_path へマージ配備し、結果（unchanged / merged / migrated）を返す。"""
+    with timings.phase("stamp"):
+        if is_up_to_date(base, target_path):
+            return "unchanged"
+
+    _import_merge_modules()
+    raw = None
     local = {}
-    if target_path.exists():
+    with timings.phase("parse"):
+        base_data = base.data()
+        if target_path.exists():
+            raw = target_path.read_bytes()
+            try:
+                local = tomllib.loads(raw.decode())
+            except (UnicodeDecodeError, tomllib.TOMLDecodeError) as err:
+                # 壊れたローカルを黙って捨てると端末状態が消えるため、手当てを促して止める
+                raise MergeError(f"配備先の TOML が不正です（修正するまでマージ中断）: {target_path}: {err}") from err
+
+    with timings.phase("deep_merge"):
+        merged = deep_merge(local, base_data)
+
+    with timings.phase("serialize"):
+        if raw is None:
+            output = dumps_toml(merged).encode()
+        elif same_value(merged, local):
+            output = raw
+        else:
+            output = render_merged(raw.decode(), local, merged).encode()
+
+    with timings.phase("write"):
+        was_symlink = target_path.is_symlink()
+        if not was_symlink and raw == output:
+            write_stamp(target_path, base, output)
+            return "unchanged"
+
+        if was_symlink:
+            target_path.unlink()
+
+        # 拡張子を置き換えると a.toml と a.json が同じ一時ファイルになるため、名前全体に付ける
+        tmp_path = target_path.with_name(target_path.name + ".tmp")
+        tmp_path.write_bytes(output)
+        os.replace(tmp_path, target_path)
+        write_stamp(target_path, base, output)
+    return "migrated" if was_symlink else "merged"
+
+
+def merge_target(base: BaseConfig, target_path: Path, timings: PhaseTimings = NO_TIMINGS) -> dict[str, str]:
+    """バッチ用: 失敗を例外にせず結果レコードとして返す。"""
+    try:
+        return {"target": str(target_path), "status": merge_into(base, target_path, timings)}
+    except (MergeError, OSError) as err:
+        return {"target": str(target_path), "status": "error", "error": str(err)}
+
+
+def target_key(target_path: Path) -> Path:
+    """同じ配備先かどうかの判定キー。相対パスや symlink 経由のディレクトリを実体に寄せる。
+
+    配備先そのものの symlink は実ファイルへ移行する対象なので解決しない
+    （解決すると、同じファイルを指す別々の symlink が 1 件にまとめられて移行されずに残る）。
+    """
+    return target_path.parent.resolve() / target_path.name
+
+
+def read_targets_file(path: Path) -> list[Path]:
+    targets = []
+    for line in path.read_text().splitlines():
+        entry = line.strip()
+        if entry and not entry.startswith("#"):
+            targets.append(Path(entry).expanduser())
+    return targets
+
+
+def batch_main(argv: list[str], timings: PhaseTimings = NO_TIMINGS) -> int:
+    import argparse
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(
+        prog=f"{Path(sys.argv[0]).name} --batch",
+        description="共有ベースを複数の配備先へ並列にマージ配備し、結果を JSON で出力する",
+    )
+    parser.add_argument("base", type=Path, help="共有ベースの config.toml")
+    parser.add_argument("targets", nargs="*", type=Path, help="配備先の config.toml")
+    parser.add_argument("--targets-file", type=Path, help="配備先パスを 1 行 1 件で列挙したファイル（# でコメント）")
+    parser.add_argument("--jobs", type=int, default=None, help="並列ワーカー数（既定: 自動）")
+    parser.add_argument("--timings", action="store_true", help="フェーズごとの時間と最大常駐メモリを JSON で標準エラーへ書く")
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs は 1 以上を指定してください")
+
+    targets = list(args.targets)
+    if args.targets_file:
         try:
-            local = tomllib.loads(target_path.read_text())
-        except tomllib.TOMLDecodeError as err:
-            # 壊れたローカルを黙って捨てると端末状態が消えるため、手当てを促して止める
-            print(f"⚠️  配備先の TOML が不正です（修正するまでマージ中断）: {target_path}: {err}", file=sys.stderr)
+            targets.extend(read_targets_file(args.targets_file))
+        except OSError as err:
+            print(f"⚠️  配備先リストを読めません: {args.targets_file}: {err}", file=sys.stderr)
             return 1
+    # 同じ配備先を並列に書くと一時ファイルが衝突するため、綴りの違う重複も除く（順序と最初の綴りは維持）
+    unique: dict[Path, Path] = {}
+    for target in targets:
+        unique.setdefault(target_key(target), target)
+    targets = list(unique.values())
+    if not targets:
+        parser.error("配備先が指定されていません")
+
+    try:
+        base = load_base(args.base)
+        # ベースの不正は配備先ごとではなくバッチ全体のエラーにする
+        with timings.phase("parse"):
+            base.data()
+    except MergeError as err:
+        print(f"⚠️  {err}", file=sys.stderr)
+        return 1
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(lambda target: merge_target(base, target, timings), targets))
+
+    print(json.dumps({"base": str(args.base), "results": results}, ensure_ascii=False, indent=2))
+    return 1 if any(result["status"] == "error" for result in results) else 0
 
-    output = tomli_w.dumps(deep_merge(local, base))
 
-    was_symlink = target_path.is_symlink()
-    if not was_symlink and target_path.exists() and target_path.read_text() == output:
-        return 0
+def main() -> int:
+    argv = sys.argv[1:]
+    timings = PhaseTimings("--timings" in argv)
+    try:
+        return run(argv, timings)
+    finally:
+        timings.report()
+
+
+def run(argv: list[str], timings: PhaseTimings) -> int:
+    if argv[:1] == ["--batch"]:
+        return batch_main(argv[1:], timings)
 
-    if was_symlink:
-        target_path.unlink()
+    args = [arg for arg in argv if arg != "--timings"]
+    if len(args) != 2:
+        print(f"Usage: {Path(sys.argv[0]).name} [--timings] <base_toml> <target_toml>", file=sys.stderr)
+        print(f"       {Path(sys.argv[0]).name} --batch <base_toml> [--targets-file FILE] [--jobs N] [--timings] [target_toml ...]", file=sys.stderr)
+        return 2
 
-    tmp_path = target_path.with_suffix(".toml.tmp")
-    tmp_path.write_text(output)
-    os.replace(tmp_path, target_path)
+    target_path = Path(args[1])
+    try:
+        status = merge_into(load_base(Path(args[0])), target_path, timings)
+    except MergeError as err:
+        print(f"⚠️  {err}", file=sys.stderr)
+        return 1
 
-    if was_symlink:
+    if status == "migrated":
         print(f"🔀 symlink を実ファイルへ移行してマージ配備しました: {target_path}")
-    else:
+    elif status == "merged":
         print(f"🔀 ベースをマージ配備しました: {target_path}")
     return 0
 
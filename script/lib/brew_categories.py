@@ -1,63 +1,324 @@
 #!/usr/bin/env python3
 
 import argparse
+import hashlib
 import json
+import os
 import re
+import resource
 import sys
+from contextlib import contextmanager, redirect_stdout, suppress
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from time import perf_counter
+from typing import Any, Iterable, Iterator, TextIO
+
+ITEM_TYPES = ("formulae", "casks")
+FORMATS = ("human", "brew")
+STREAM_FORMATS = ("jsonl",)
+UNCATEGORIZED_TITLE = "Uncategorized"
+CACHE_FORMAT = 2
+MAX_CACHE_ENTRIES = 8
+
+
+@dataclass
+class OutputSpec:
+    item_type: str
+    fmt: str
+    path: Path | None = None
+
+
+def parse_output_spec(value: str) -> OutputSpec:
+    parts = value.split(":", 2)
+    if len(parts) < 2 or parts[0] not in ITEM_TYPES or parts[1] not in FORMATS:
+        raise argparse.ArgumentTypeError(
+            f"expected TYPE:FORMAT[:PATH] with TYPE in {ITEM_TYPES} and FORMAT in {FORMATS}, got {value!r}"
+        )
+    path = Path(parts[2]) if len(parts) == 3 and parts[2] else None
+    return OutputSpec(parts[0], parts[1], path)
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "brew-categories"
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Categorize Brew packages")
     parser.add_argument("--manifest", required=True, help="Path to categories.json manifest")
-    parser.add_argument("--type", choices=["formulae", "casks"], required=True, help="Item type to categorize")
+    parser.add_argument("--type", choices=ITEM_TYPES, help="Item type to categorize (required unless --batch)")
     parser.add_argument(
         "--format",
-        choices=["human", "brew"],
+        choices=FORMATS + STREAM_FORMATS,
         default="human",
-        help="Output format (human-readable or Brewfile snippet)",
+        help="Output format (human-readable, Brewfile snippet, or one JSON record per item streamed as read)",
     )
     parser.add_argument(
         "--label-uncategorized",
         action="store_true",
         help="Whether to include an Uncategorized section (only used in human format)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="Directory for the compiled-manifest cache (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Compile the manifest from scratch without reading or writing the cache",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help=(
+            "Read several item lists from stdin, either a JSON object keyed by type or "
+            "'<type> <item>' lines, and write every --output in one run"
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        action="append",
+        type=parse_output_spec,
+        default=[],
+        metavar="TYPE:FORMAT[:PATH]",
+        help="Batch output to produce; without PATH it is written to stdout after a '==> TYPE:FORMAT <==' line",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help=(
+            "Report per-phase wall time and peak memory as JSON on stderr "
+            "(jsonl interleaves reading, categorizing and emitting, so it reports one 'stream' phase)"
+        ),
+    )
+    args = parser.parse_args()
+    if args.batch and not args.output:
+        parser.error("--batch requires at least one --output")
+    if not args.batch and not args.type:
+        parser.error("the following arguments are required: --type")
+    return args
+
+
+def max_rss_bytes() -> int:
+    # Linux carries ru_maxrss over exec from the parent, so prefer this process's own high-water mark
+    with suppress(OSError):
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    # ru_maxrss is in KiB on Linux but in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
 
 
-def load_manifest(path: Path) -> dict[str, Any]:
+class PhaseTimings:
+    """Wall time and the process peak RSS reached by the end of each phase, reported as JSON on stderr."""
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.phases: dict[str, dict[str, Any]] = {}
+        self._started = perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            seconds = perf_counter() - started
+            rss = max_rss_bytes()
+            entry = self.phases.setdefault(name, {"seconds": 0.0, "max_rss_bytes": 0, "calls": 0})
+            entry["seconds"] += seconds
+            entry["max_rss_bytes"] = max(entry["max_rss_bytes"], rss)
+            entry["calls"] += 1
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        report = {
+            "tool": "brew_categories",
+            "phases": self.phases,
+            "total_seconds": perf_counter() - self._started,
+            "max_rss_bytes": max_rss_bytes(),
+        }
+        print(json.dumps(report), file=sys.stderr)
+
+
+NO_TIMINGS = PhaseTimings(False)
+
+
+_TRIE_END = ""
+
+
+def _trie_indexes(node: dict[str, Any]) -> Iterator[Any]:
+    for key, child in node.items():
+        if key == _TRIE_END:
+            yield child
+        elif isinstance(child, dict):
+            yield from _trie_indexes(child)
+        else:
+            raise TypeError("malformed prefix trie in category index cache entry")
+
+
+@dataclass
+class CategoryIndex:
+    """Manifest categories compiled for one-pass lookup (first category wins)."""
+
+    titles: list[str]
+    ids: list[str | None]
+    exact: dict[str, int] = field(default_factory=dict)
+    prefixes: dict[str, Any] = field(default_factory=dict)
+    patterns: list[tuple[int, list[re.Pattern[str]]]] = field(default_factory=list)
+
+    def lookup(self, item: str) -> int | None:
+        best = self.exact.get(item)
+        node = self.prefixes
+        depth = 0
+        while True:
+            idx = node.get(_TRIE_END)
+            if idx is not None and (best is None or idx < best):
+                best = idx
+            if depth == len(item) or item[depth] not in node:
+                break
+            node = node[item[depth]]
+            depth += 1
+        for idx, compiled in self.patterns:
+            if best is not None and idx >= best:
+                break
+            if any(pattern.search(item) for pattern in compiled):
+                return idx
+        return best
+
+    def to_cache(self) -> dict[str, Any]:
+        return {
+            "titles": self.titles,
+            "ids": self.ids,
+            "exact": self.exact,
+            "prefixes": self.prefixes,
+            "patterns": [[idx, [pattern.pattern for pattern in compiled]] for idx, compiled in self.patterns],
+        }
+
+    @classmethod
+    def from_cache(cls, data: dict[str, Any]) -> "CategoryIndex":
+        if not isinstance(data["exact"], dict) or not isinstance(data["prefixes"], dict):
+            raise TypeError("malformed category index cache entry")
+        titles, ids = data["titles"], data["ids"]
+        if not isinstance(titles, list) or not isinstance(ids, list) or len(titles) != len(ids):
+            raise ValueError("category index cache entry has mismatched titles and ids")
+        # Every stored index must point at a category, or lookups crash long after loading
+        indexes = [*data["exact"].values(), *_trie_indexes(data["prefixes"]), *(idx for idx, _ in data["patterns"])]
+        if not all(type(idx) is int and 0 <= idx < len(titles) for idx in indexes):
+            raise ValueError("category index cache entry refers to unknown categories")
+        return cls(
+            titles=data["titles"],
+            ids=data["ids"],
+            exact=data["exact"],
+            prefixes=data["prefixes"],
+            patterns=[(idx, [re.compile(source) for source in sources]) for idx, sources in data["patterns"]],
+        )
+
+
+def compile_patterns(patterns: list[str]) -> list[re.Pattern[str]]:
+    compiled = [re.compile(pattern) for pattern in patterns]
+    # Capture groups (backreferences, duplicate names) and global inline flags
+    # change meaning inside an alternation, so those stay as separate patterns.
+    if len(compiled) < 2 or any(c.groups or c.flags != re.UNICODE for c in compiled):
+        return compiled
+    combined = "|".join(f"(?P<p{pos}>{pattern})" for pos, pattern in enumerate(patterns))
     try:
-        with path.open() as fh:
-            return json.load(fh)
+        return [re.compile(combined)]
+    except re.error:
+        return compiled
+
+
+def compile_categories(categories: list[dict[str, Any]]) -> CategoryIndex:
+    index = CategoryIndex(
+        titles=[category.get("title", category.get("id", "Unknown")) for category in categories],
+        ids=[category.get("id") for category in categories],
+    )
+    for idx, category in enumerate(categories):
+        match_spec = category.get("match", {})
+        for exact in match_spec.get("exact", []):
+            index.exact.setdefault(exact, idx)
+        for prefix in match_spec.get("prefix", []):
+            node = index.prefixes
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault(_TRIE_END, idx)
+        if match_spec.get("regex"):
+            index.patterns.append((idx, compile_patterns(match_spec["regex"])))
+    return index
+
+
+def compile_manifest(manifest: dict[str, Any]) -> dict[str, CategoryIndex]:
+    return {item_type: compile_categories(manifest.get(item_type, [])) for item_type in ITEM_TYPES}
+
+
+def _read_cache(cache_file: Path) -> dict[str, CategoryIndex] | None:
+    try:
+        data = json.loads(cache_file.read_text())
+        indexes = {item_type: CategoryIndex.from_cache(data[item_type]) for item_type in ITEM_TYPES}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError, re.error):
+        # A corrupt or truncated entry is rebuilt (and overwritten) from the manifest
+        return None
+    with suppress(OSError):
+        # Refresh mtime so eviction drops the least recently used entries
+        os.utime(cache_file)
+    return indexes
+
+
+def _write_cache(cache_dir: Path, cache_file: Path, indexes: dict[str, CategoryIndex]) -> None:
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps({item_type: index.to_cache() for item_type, index in indexes.items()}))
+        os.replace(tmp_file, cache_file)
+        entries = sorted(cache_dir.glob("*.json"), key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for stale in entries[MAX_CACHE_ENTRIES:]:
+            stale.unlink(missing_ok=True)
+    except OSError:
+        # The cache is only an accelerator; a read-only or full cache dir must not fail the run
+        pass
+
+
+def load_indexes(path: Path, cache_dir: Path | None) -> dict[str, CategoryIndex]:
+    """Compiled indexes for every item type, served from the content-hash cache when possible."""
+    try:
+        raw = path.read_bytes()
     except FileNotFoundError as exc:
         raise SystemExit(f"Manifest not found: {path}") from exc
+    if cache_dir is None:
+        return compile_manifest(json.loads(raw))
 
-
-def matches(match_spec: dict[str, Any], item: str) -> bool:
-    if any(item == exact for exact in match_spec.get("exact", [])):
-        return True
-    if any(item.startswith(prefix) for prefix in match_spec.get("prefix", [])):
-        return True
-    for pattern in match_spec.get("regex", []):
-        if re.search(pattern, item):
-            return True
-    return False
+    digest = hashlib.sha256(raw).hexdigest()
+    version = f"py{sys.version_info.major}{sys.version_info.minor}"
+    cache_file = cache_dir / f"{digest}-{version}-v{CACHE_FORMAT}.json"
+    indexes = _read_cache(cache_file)
+    if indexes is None:
+        indexes = compile_manifest(json.loads(raw))
+        _write_cache(cache_dir, cache_file, indexes)
+    return indexes
 
 
 def categorize(
     items: list[str],
-    categories: list[dict[str, Any]],
+    categories: list[dict[str, Any]] | CategoryIndex,
 ) -> tuple[list[tuple[str, list[str]]], list[str]]:
-    assigned: set[str] = set()
-    sections: list[tuple[str, list[str]]] = []
-    for category in categories:
-        match_spec = category.get("match", {})
-        matched = [item for item in items if item not in assigned and matches(match_spec, item)]
-        if matched:
-            sections.append((category.get("title", category.get("id", "Unknown")), matched))
-            assigned.update(matched)
-    remaining = [item for item in items if item not in assigned]
+    index = categories if isinstance(categories, CategoryIndex) else compile_categories(categories)
+    buckets: dict[int, list[str]] = {}
+    remaining: list[str] = []
+    for item in items:
+        idx = index.lookup(item)
+        if idx is None:
+            remaining.append(item)
+        else:
+            buckets.setdefault(idx, []).append(item)
+    sections = [(index.titles[idx], buckets[idx]) for idx in sorted(buckets)]
     return sections, remaining
 
 
@@ -71,7 +332,7 @@ def emit_human(
         print("\n".join(rows) if rows else "")
         print()
     if show_uncategorized:
-        print("=== Uncategorized ===")
+        print(f"=== {UNCATEGORIZED_TITLE} ===")
         print("\n".join(remaining) if remaining else "")
 
 
@@ -89,23 +350,138 @@ def emit_brew(
             print(f'{keyword} "{row}"')
         print()
     if remaining:
-        print("# Uncategorized")
+        print(f"# {UNCATEGORIZED_TITLE}")
         for row in remaining:
             print(f'{keyword} "{row}"')
         print()
 
 
-def main() -> None:
-    args = parse_args()
-    manifest = load_manifest(Path(args.manifest))
-    items = [line.strip() for line in sys.stdin if line.strip()]
-    categories = manifest.get(args.type, [])
-    sections, remaining = categorize(items, categories)
+def read_items(stream: TextIO) -> Iterator[str]:
+    for line in stream:
+        item = line.strip()
+        if item:
+            yield item
+
+
+def stream_records(items: Iterable[str], index: CategoryIndex) -> Iterator[dict[str, Any]]:
+    for item in items:
+        idx = index.lookup(item)
+        if idx is None:
+            yield {"item": item, "category_id": None, "title": UNCATEGORIZED_TITLE}
+        else:
+            yield {"item": item, "category_id": index.ids[idx], "title": index.titles[idx]}
+
 
-    if args.format == "human":
-        emit_human(sections, remaining, args.label_uncategorized)
+def emit_jsonl(records: Iterable[dict[str, Any]]) -> None:
+    try:
+        for record in records:
+            sys.stdout.write(json.dumps(record) + "\n")
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # Downstream stopped reading (e.g. `| head`); silence the flush at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def emit(
+    sections: list[tuple[str, list[str]]],
+    remaining: list[str],
+    item_type: str,
+    fmt: str,
+    show_uncategorized: bool,
+) -> None:
+    if fmt == "human":
+        emit_human(sections, remaining, show_uncategorized)
     else:
-        emit_brew(sections, remaining, args.type)
+        emit_brew(sections, remaining, item_type)
+
+
+def _batch_type(item_type: Any, where: str) -> str:
+    if item_type not in ITEM_TYPES:
+        raise SystemExit(f"Unknown item type in batch input ({where}): {item_type!r}; expected one of {ITEM_TYPES}")
+    return item_type
+
+
+def read_batch_items(stream: TextIO) -> dict[str, list[str]]:
+    text = stream.read()
+    if text.lstrip().startswith(("{", "[")):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise SystemExit(f"Invalid batch JSON input: {exc}") from exc
+        if not isinstance(data, dict):
+            raise SystemExit("Invalid batch JSON input: expected an object mapping item types to lists of names")
+        items: dict[str, list[str]] = {}
+        for item_type, rows in data.items():
+            _batch_type(item_type, "JSON key")
+            if not isinstance(rows, list) or not all(isinstance(item, str) for item in rows):
+                raise SystemExit(f"Invalid batch JSON input: {item_type!r} must be a list of strings")
+            items[item_type] = [item.strip() for item in rows if item.strip()]
+        return items
+    items = {}
+    for lineno, line in enumerate(text.splitlines(), 1):
+        parts = line.split(None, 1)
+        if not parts:
+            continue
+        if len(parts) == 1:
+            raise SystemExit(f"Invalid batch input line {lineno}: expected '<type> <item>', got {line.strip()!r}")
+        items.setdefault(_batch_type(parts[0], f"line {lineno}"), []).append(parts[1].strip())
+    return items
+
+
+def run_batch(
+    indexes: dict[str, CategoryIndex],
+    items: dict[str, list[str]],
+    outputs: list[OutputSpec],
+    show_uncategorized: bool,
+    timings: PhaseTimings = NO_TIMINGS,
+) -> None:
+    results: dict[str, tuple[list[tuple[str, list[str]]], list[str]]] = {}
+    for spec in outputs:
+        if spec.item_type not in results:
+            with timings.phase("categorize"):
+                results[spec.item_type] = categorize(items.get(spec.item_type, []), indexes[spec.item_type])
+        sections, remaining = results[spec.item_type]
+        with timings.phase("emit"):
+            if spec.path is None:
+                print(f"==> {spec.item_type}:{spec.fmt} <==")
+                emit(sections, remaining, spec.item_type, spec.fmt, show_uncategorized)
+                continue
+            try:
+                with spec.path.open("w") as fh, redirect_stdout(fh):
+                    emit(sections, remaining, spec.item_type, spec.fmt, show_uncategorized)
+            except OSError as exc:
+                raise SystemExit(f"Cannot write batch output {spec.path}: {exc}") from exc
+
+
+def run(args: argparse.Namespace, timings: PhaseTimings) -> None:
+    with timings.phase("load"):
+        indexes = load_indexes(Path(args.manifest), None if args.no_cache else args.cache_dir)
+    if args.batch:
+        with timings.phase("read"):
+            items = read_batch_items(sys.stdin)
+        run_batch(indexes, items, args.output, args.label_uncategorized, timings)
+        return
+
+    if args.format in STREAM_FORMATS:
+        with timings.phase("stream"):
+            emit_jsonl(stream_records(read_items(sys.stdin), indexes[args.type]))
+        return
+
+    with timings.phase("read"):
+        items = list(read_items(sys.stdin))
+    with timings.phase("categorize"):
+        sections, remaining = categorize(items, indexes[args.type])
+    with timings.phase("emit"):
+        emit(sections, remaining, args.type, args.format, args.label_uncategorized)
+
+
+def main() -> None:
+    args = parse_args()
+    timings = PhaseTimings(args.timings)
+    try:
+        run(args, timings)
+    finally:
+        timings.report()
 
 
 if __name__ == "__main__":
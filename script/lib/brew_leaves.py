@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from brew_categories import categorize, default_cache_dir, emit, load_indexes
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="List Brew leaves from a `brew info --json=v2 --installed` dump",
+    )
+    parser.add_argument(
+        "--input",
+        default="-",
+        help="Path to the brew info JSON dump (default: read from stdin)",
+    )
+    parser.add_argument("--type", choices=["formulae", "casks"], required=True, help="Item type to list")
+    parser.add_argument(
+        "--manifest",
+        help="Path to categories.json manifest; when given, leaves are categorized instead of listed",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["human", "brew"],
+        default="human",
+        help="Output format when categorizing (human-readable or Brewfile snippet)",
+    )
+    parser.add_argument(
+        "--label-uncategorized",
+        action="store_true",
+        help="Whether to include an Uncategorized section (only used in human format)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="Directory for the compiled-manifest cache (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Compile the manifest from scratch without reading or writing the cache",
+    )
+    return parser.parse_args()
+
+
+def load_brew_info(source: str) -> dict[str, Any]:
+    try:
+        if source == "-":
+            return json.load(sys.stdin)
+        with Path(source).open() as fh:
+            return json.load(fh)
+    except FileNotFoundError as exc:
+        raise SystemExit(f"Brew info dump not found: {source}") from exc
+    except json.JSONDecodeError as exc:
+        raise SystemExit(f"Invalid brew info JSON: {source}: {exc}") from exc
+
+
+def _resolver(entries: list[dict[str, Any]], key: str, full_key: str, *extra: str) -> dict[str, str]:
+    """Map every name an entry can be referenced by to its canonical (full) name."""
+    names: dict[str, str] = {}
+    for entry in entries:
+        canonical = entry.get(full_key) or entry[key]
+        for field in (key, full_key, *extra):
+            value = entry.get(field)
+            for name in value if isinstance(value, list) else [value]:
+                if name:
+                    names.setdefault(name, canonical)
+    return names
+
+
+def _formula_runtime_deps(formula: dict[str, Any]) -> list[str]:
+    kegs = formula.get("installed") or []
+    runtime = [dep for keg in kegs for dep in (keg.get("runtime_dependencies") or [])]
+    if runtime:
+        return [dep["full_name"] for dep in runtime if dep.get("full_name")]
+    # Kegs poured before runtime dependencies were recorded only carry declared deps
+    return list(formula.get("dependencies") or [])
+
+
+def formula_leaves(info: dict[str, Any]) -> list[str]:
+    """Equivalent of `brew leaves`: installed formulae no installed formula or cask depends on."""
+    formulae = info.get("formulae", [])
+    resolve = _resolver(formulae, "name", "full_name", "aliases", "oldnames")
+    depended: set[str] = set()
+    for formula in formulae:
+        depended.update(resolve.get(dep, dep) for dep in _formula_runtime_deps(formula))
+    for cask in info.get("casks", []):
+        depends_on = cask.get("depends_on") or {}
+        depended.update(resolve.get(dep, dep) for dep in depends_on.get("formula", []))
+    return sorted(name for name in (f.get("full_name") or f["name"] for f in formulae) if name not in depended)
+
+
+def cask_leaves(info: dict[str, Any]) -> list[str]:
+    """Installed casks that no other installed cask depends on (`brew uses --cask --installed`)."""
+    casks = info.get("casks", [])
+    resolve = _resolver(casks, "token", "full_token", "old_tokens")
+    depended: set[str] = set()
+    for cask in casks:
+        depends_on = cask.get("depends_on") or {}
+        depended.update(resolve.get(dep, dep) for dep in depends_on.get("cask", []))
+    leaves = []
+    for cask in casks:
+        if (cask.get("full_token") or cask["token"]) not in depended:
+            leaves.append(cask["token"])
+    return sorted(leaves)
+
+
+def emit_leaves(leaves: list[str]) -> None:
+    for leaf in leaves:
+        print(leaf)
+
+
+def main() -> None:
+    args = parse_args()
+    info = load_brew_info(args.input)
+    leaves = formula_leaves(info) if args.type == "formulae" else cask_leaves(info)
+
+    if not args.manifest:
+        emit_leaves(leaves)
+        return
+
+    indexes = load_indexes(Path(args.manifest), None if args.no_cache else args.cache_dir)
+    sections, remaining = categorize(leaves, indexes[args.type])
+    emit(sections, remaining, args.type, args.format, args.label_uncategorized)
+
+
+if __name__ == "__main__":
+    main()
@@ -219,9 +219,20 @@ config::deploy_codex_config() {
   local base="${1:?Base config.toml required}"
   local target="${2:?Target config.toml required}"
   local merge_script="$CONFIG_SCRIPT_DIR/codex-config-merge.py"
+  local -a merge_cmd=()
+
+  # マージスクリプトは標準ライブラリのみで動くため、tomllib のある python3 (3.11+) を
+  # 直接使う。無ければ uv に適合する Python を用意させる
+  if [[ -f "$merge_script" ]]; then
+    if command -v python3 >/dev/null 2>&1 && python3 -c 'import tomllib' >/dev/null 2>&1; then
+      merge_cmd=(python3 "$merge_script")
+    elif command -v uv >/dev/null 2>&1; then
+      merge_cmd=(uv run --script --quiet "$merge_script")
+    fi
+  fi
 
-  if command -v uv >/dev/null 2>&1 && [[ -f "$merge_script" ]]; then
-    if uv run --script --quiet "$merge_script" "$base" "$target"; then
+  if [[ ${#merge_cmd[@]} -gt 0 ]]; then
+    if "${merge_cmd[@]}" "$base" "$target"; then
       echo "✅ Deployed codex/config.toml (merge)"
       return 0
     fi
@@ -229,18 +240,18 @@ config::deploy_codex_config() {
     return 1
   fi
 
-  # uv が無い環境のフォールバック（マージはしないが dirty の原因は残さない）
+  # Python 3.11+ も uv も無い環境のフォールバック（マージはしないが dirty の原因は残さない）
   if [[ -L "$target" ]]; then
     local content
     content="$(cat "$target")"
     rm "$target"
     printf '%s' "$content" >"$target"
-    echo "⚠️  uv が無いためマージをスキップ（symlink は実ファイル化しました）: $target"
+    echo "⚠️  Python 3.11+ が無いためマージをスキップ（symlink は実ファイル化しました）: $target"
   elif [[ ! -e "$target" ]]; then
     cp "$base" "$target"
-    echo "✅ Seeded codex/config.toml (uv 無しのため単純コピー)"
+    echo "✅ Seeded codex/config.toml (Python 3.11+ 無しのため単純コピー)"
   else
-    echo "⚠️  uv が無いため codex/config.toml のマージをスキップしました"
+    echo "⚠️  Python 3.11+ が無いため codex/config.toml のマージをスキップしました"
   fi
 }
 
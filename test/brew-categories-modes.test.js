@@ -0,0 +1,336 @@
+'use strict';
+
+/**
+ * Tests for script/lib/brew_categories.py run modes
+ *
+ *  - Batch mode: several item lists and outputs in one process
+ *  - Compiled-manifest cache: hits, corruption fallback, eviction, --no-cache
+ *  - Streaming JSON-lines output
+ *  - --timings phase report
+ */
+
+const fs = require('fs');
+const path = require('path');
+const { contextDir, cacheHome, runScript, withTempManifest } = require('./helpers/brew-categories');
+
+afterAll(() => {
+  fs.rmSync(cacheHome, { recursive: true, force: true });
+});
+
+// ──────────────────────────────────────────────────────────────────────────────
+// Batch mode (several item lists and outputs in one run)
+// ──────────────────────────────────────────────────────────────────────────────
+describe('brew_categories.py — batch mode', () => {
+  const manifest = {
+    formulae: [{ id: 'vcs', title: 'VCS', match: { exact: ['git'] } }],
+    casks: [{ id: 'browsers', title: 'Browsers', match: { exact: ['firefox'] } }],
+  };
+
+  test('tagged-line input writes delimited sections to stdout', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      const result = runScript(
+        [
+          '--manifest',
+          manifestPath,
+          '--batch',
+          '--label-uncategorized',
+          '--output',
+          'formulae:human',
+          '--output',
+          'casks:brew',
+        ],
+        'formulae git\nformulae nvim\ncasks\tfirefox\n',
+      );
+      expect(result.status).toBe(0);
+      expect(result.stdout).toBe(
+        [
+          '==> formulae:human <==',
+          '=== VCS ===',
+          'git',
+          '',
+          '=== Uncategorized ===',
+          'nvim',
+          '==> casks:brew <==',
+          '# Browsers',
+          'cask "firefox"',
+          '',
+          '',
+        ].join('\n'),
+      );
+    });
+  });
+
+  test('JSON input matches the per-type output and can be written to files', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      const formulaePath = path.join(contextDir, 'brew-categories-test-formulae.out');
+      const casksPath = path.join(contextDir, 'brew-categories-test-casks.out');
+      try {
+        const result = runScript(
+          [
+            '--manifest',
+            manifestPath,
+            '--batch',
+            '--output',
+            `formulae:brew:${formulaePath}`,
+            '--output',
+            `casks:brew:${casksPath}`,
+          ],
+          JSON.stringify({ formulae: ['git', 'nvim'], casks: ['firefox', 'slack'] }),
+        );
+        expect(result.status).toBe(0);
+        expect(result.stdout).toBe('');
+
+        const single = runScript(
+          ['--manifest', manifestPath, '--type', 'formulae', '--format', 'brew'],
+          'git\nnvim\n',
+        );
+        expect(fs.readFileSync(formulaePath, 'utf8')).toBe(single.stdout);
+        expect(fs.readFileSync(casksPath, 'utf8')).toBe(
+          '# Browsers\ncask "firefox"\n\n# Uncategorized\ncask "slack"\n\n',
+        );
+      } finally {
+        fs.rmSync(formulaePath, { force: true });
+        fs.rmSync(casksPath, { force: true });
+      }
+    });
+  });
+
+  test.each([
+    ['a string instead of a list', JSON.stringify({ formulae: 'git' }), "'formulae' must be a list of strings"],
+    ['non-string items', JSON.stringify({ formulae: [1, { a: 2 }] }), "'formulae' must be a list of strings"],
+    ['a top-level array', JSON.stringify(['git']), 'expected an object'],
+    ['an unknown JSON type', JSON.stringify({ taps: ['core'] }), 'Unknown item type in batch input (JSON key)'],
+    ['an unknown tagged type', 'formulae git\ntaps homebrew/core\n', 'Unknown item type in batch input (line 2)'],
+    ['a line without a type', 'formulae git\ngit\n', 'Invalid batch input line 2'],
+  ])('rejects batch input with %s', (_label, input, message) => {
+    withTempManifest(manifest, (manifestPath) => {
+      const result = runScript(['--manifest', manifestPath, '--batch', '--output', 'formulae:brew'], input);
+      expect(result.status).not.toBe(0);
+      expect(result.stderr).toContain(message);
+      expect(result.stdout).toBe('');
+    });
+  });
+
+  test('--batch without --output exits non-zero', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      const result = runScript(['--manifest', manifestPath, '--batch'], 'formulae git\n');
+      expect(result.status).not.toBe(0);
+    });
+  });
+
+  test('malformed --output spec exits non-zero', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      const result = runScript(['--manifest', manifestPath, '--batch', '--output', 'taps:brew'], '');
+      expect(result.status).not.toBe(0);
+      expect(result.stderr).toContain('TYPE:FORMAT[:PATH]');
+    });
+  });
+
+  test('an unwritable output path exits with a message instead of a traceback', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      const outputPath = path.join(contextDir, 'brew-categories-missing-dir', 'formulae.out');
+      const result = runScript(
+        ['--manifest', manifestPath, '--batch', '--output', `formulae:brew:${outputPath}`],
+        'formulae git\n',
+      );
+      expect(result.status).not.toBe(0);
+      expect(result.stderr).toContain(`Cannot write batch output ${outputPath}:`);
+      expect(result.stderr).not.toContain('Traceback');
+    });
+  });
+});
+
+// ──────────────────────────────────────────────────────────────────────────────
+// Compiled-manifest cache
+// ──────────────────────────────────────────────────────────────────────────────
+describe('brew_categories.py — compiled-manifest cache', () => {
+  const manifest = {
+    formulae: [
+      { id: 'vcs', title: 'VCS', match: { exact: ['git'], prefix: ['git-'] } },
+      { id: 'go', title: 'Go', match: { regex: ['^go$', '^go@'] } },
+    ],
+  };
+  const args = (manifestPath, cacheDir) => [
+    '--manifest',
+    manifestPath,
+    '--type',
+    'formulae',
+    '--format',
+    'brew',
+    '--cache-dir',
+    cacheDir,
+  ];
+  const stdin = 'git\ngit-lfs\ngo@1.22\nnvim\n';
+
+  function withCacheDir(callback) {
+    fs.mkdirSync(contextDir, { recursive: true });
+    const cacheDir = fs.mkdtempSync(path.join(contextDir, 'brew-categories-cache-'));
+    try {
+      callback(cacheDir);
+    } finally {
+      fs.rmSync(cacheDir, { recursive: true, force: true });
+    }
+  }
+
+  test('cached runs produce identical output to uncached runs', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      withCacheDir((cacheDir) => {
+        const uncached = runScript([...args(manifestPath, cacheDir), '--no-cache'], stdin);
+        expect(fs.readdirSync(cacheDir)).toEqual([]);
+
+        const cold = runScript(args(manifestPath, cacheDir), stdin);
+        const entries = fs.readdirSync(cacheDir);
+        expect(entries).toHaveLength(1);
+        expect(entries[0]).toMatch(/^[0-9a-f]{64}-py\d+-v\d+\.json$/);
+
+        const warm = runScript(args(manifestPath, cacheDir), stdin);
+        expect(cold.stdout).toBe(uncached.stdout);
+        expect(warm.stdout).toBe(uncached.stdout);
+        expect(warm.stdout).toContain('# Go\nbrew "go@1.22"\n');
+      });
+    });
+  });
+
+  test('a corrupt cache entry is ignored and rebuilt', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      withCacheDir((cacheDir) => {
+        const expected = runScript(args(manifestPath, cacheDir), stdin).stdout;
+        const [entry] = fs.readdirSync(cacheDir);
+        for (const corrupt of ['{"formulae": [', '{"formulae": {"exact": []}}']) {
+          fs.writeFileSync(path.join(cacheDir, entry), corrupt);
+          const result = runScript(args(manifestPath, cacheDir), stdin);
+          expect(result.status).toBe(0);
+          expect(result.stdout).toBe(expected);
+          expect(JSON.parse(fs.readFileSync(path.join(cacheDir, entry), 'utf8'))).toHaveProperty('casks');
+        }
+      });
+    });
+  });
+
+  test('a cache entry whose indexes do not match its categories is rebuilt', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      withCacheDir((cacheDir) => {
+        const expected = runScript(args(manifestPath, cacheDir), stdin).stdout;
+        const [entry] = fs.readdirSync(cacheDir);
+        const valid = JSON.parse(fs.readFileSync(path.join(cacheDir, entry), 'utf8'));
+        const inconsistent = [
+          { titles: [], ids: [], exact: { git: 0 } },
+          { ids: [] },
+          { exact: { git: 'vcs' } },
+          { prefixes: { g: { '': 99 } } },
+          { prefixes: { g: 'not-a-node' } },
+          { patterns: [[true, ['^g']]] },
+        ];
+        for (const formulae of inconsistent) {
+          const corrupt = { ...valid, formulae: { ...valid.formulae, ...formulae } };
+          fs.writeFileSync(path.join(cacheDir, entry), JSON.stringify(corrupt));
+          const result = runScript(args(manifestPath, cacheDir), stdin);
+          expect(result.status).toBe(0);
+          expect(result.stdout).toBe(expected);
+          expect(JSON.parse(fs.readFileSync(path.join(cacheDir, entry), 'utf8'))).toEqual(valid);
+        }
+      });
+    });
+  });
+
+  test('a changed manifest gets a new entry and old entries are evicted', () => {
+    withCacheDir((cacheDir) => {
+      for (let i = 0; i < 10; i += 1) {
+        const variant = { formulae: [{ id: `c${i}`, title: `C${i}`, match: { exact: ['git'] } }] };
+        withTempManifest(variant, (manifestPath) => {
+          const result = runScript(args(manifestPath, cacheDir), 'git\n');
+          expect(result.stdout).toContain(`# C${i}\n`);
+        });
+      }
+      expect(fs.readdirSync(cacheDir).length).toBeLessThanOrEqual(8);
+    });
+  });
+});
+
+// ──────────────────────────────────────────────────────────────────────────────
+// Streaming JSON-lines output
+// ──────────────────────────────────────────────────────────────────────────────
+describe('brew_categories.py — jsonl format output', () => {
+  test('emits one {item, category_id, title} record per input line in input order', () => {
+    const manifest = {
+      formulae: [
+        { id: 'vcs', title: 'Version Control', match: { exact: ['git'] } },
+        { id: 'lua', title: 'Lua', match: { prefix: ['lua'] } },
+      ],
+    };
+    withTempManifest(manifest, (manifestPath) => {
+      const result = runScript(
+        ['--manifest', manifestPath, '--type', 'formulae', '--format', 'jsonl'],
+        'luarocks\n\nnvim\ngit\n',
+      );
+      expect(result.status).toBe(0);
+      const records = result.stdout
+        .trim()
+        .split('\n')
+        .map((line) => JSON.parse(line));
+      expect(records).toEqual([
+        { item: 'luarocks', category_id: 'lua', title: 'Lua' },
+        { item: 'nvim', category_id: null, title: 'Uncategorized' },
+        { item: 'git', category_id: 'vcs', title: 'Version Control' },
+      ]);
+    });
+  });
+
+  test('empty stdin produces no records', () => {
+    withTempManifest({ formulae: [] }, (manifestPath) => {
+      const result = runScript(['--manifest', manifestPath, '--type', 'formulae', '--format', 'jsonl'], '');
+      expect(result.status).toBe(0);
+      expect(result.stdout).toBe('');
+    });
+  });
+});
+
+// ──────────────────────────────────────────────────────────────────────────────
+// Phase timings
+// ──────────────────────────────────────────────────────────────────────────────
+describe('brew_categories.py — --timings', () => {
+  const manifest = { formulae: [{ id: 'vcs', title: 'VCS', match: { exact: ['git'] } }] };
+
+  function timingsReport(result) {
+    expect(result.status).toBe(0);
+    const report = JSON.parse(result.stderr.trim());
+    expect(report.tool).toBe('brew_categories');
+    expect(report.max_rss_bytes).toBeGreaterThan(0);
+    return report;
+  }
+
+  test('reports load, read, categorize and emit on stderr without touching stdout', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      const args = ['--manifest', manifestPath, '--type', 'formulae', '--format', 'brew'];
+      const plain = runScript(args, 'git\nnvim\n');
+      const timed = runScript([...args, '--timings'], 'git\nnvim\n');
+
+      expect(timed.stdout).toBe(plain.stdout);
+      const report = timingsReport(timed);
+      expect(Object.keys(report.phases)).toEqual(['load', 'read', 'categorize', 'emit']);
+      for (const phase of Object.values(report.phases)) {
+        expect(phase.calls).toBe(1);
+        expect(phase.seconds).toBeGreaterThanOrEqual(0);
+      }
+    });
+  });
+
+  test('jsonl reports a single stream phase and batch mode sums emits per output', () => {
+    withTempManifest(manifest, (manifestPath) => {
+      const stream = runScript(
+        ['--manifest', manifestPath, '--type', 'formulae', '--format', 'jsonl', '--timings'],
+        'git\n',
+      );
+      expect(Object.keys(timingsReport(stream).phases)).toEqual(['load', 'stream']);
+
+      const batch = runScript(
+        ['--manifest', manifestPath, '--batch', '--output', 'formulae:brew', '--output', 'formulae:human', '--timings'],
+        'formulae git\n',
+      );
+      const { phases } = timingsReport(batch);
+      expect(Object.keys(phases)).toEqual(['load', 'read', 'categorize', 'emit']);
+      expect(phases.categorize.calls).toBe(1);
+      expect(phases.emit.calls).toBe(2);
+    });
+  });
+});
@@ -13,49 +13,11 @@
  */
 
 const fs = require('fs');
-const path = require('path');
-const { spawnSync } = require('child_process');
+const { scriptPath, cacheHome, runScript, withTempManifest } = require('./helpers/brew-categories');
 
-const repoPath = path.resolve(__dirname, '..');
-const scriptPath = path.join(repoPath, 'script', 'lib', 'brew_categories.py');
-const contextDir = path.join(repoPath, '.context');
-
-/**
- * Run brew_categories.py with the given args and stdin input.
- * @param {string[]} args
- * @param {string} [stdin]
- * @returns {{ status: number, stdout: string, stderr: string }}
- */
-function runScript(args, stdin = '') {
-  const result = spawnSync('python3', [scriptPath, ...args], {
-    cwd: repoPath,
-    input: stdin,
-    encoding: 'utf8',
-    timeout: 10000,
-  });
-  return {
-    status: result.status ?? 1,
-    stdout: result.stdout ?? '',
-    stderr: result.stderr ?? '',
-  };
-}
-
-/**
- * Write a temporary manifest JSON file under .context/ and invoke callback.
- * The file is removed after the callback returns.
- * @param {object} categories - Object to serialize as JSON manifest
- * @param {(manifestPath: string) => void} callback
- */
-function withTempManifest(categories, callback) {
-  fs.mkdirSync(contextDir, { recursive: true });
-  const manifestPath = path.join(contextDir, 'brew-categories-test-manifest.json');
-  try {
-    fs.writeFileSync(manifestPath, JSON.stringify(categories));
-    callback(manifestPath);
-  } finally {
-    fs.rmSync(manifestPath, { force: true });
-  }
-}
+afterAll(() => {
+  fs.rmSync(cacheHome, { recursive: true, force: true });
+});
 
 // ──────────────────────────────────────────────────────────────────────────────
 // Script existence and CLI argument validation
@@ -263,3 +225,72 @@ describe('brew_categories.py — human format output', () => {
     });
   });
 });
+
+// ──────────────────────────────────────────────────────────────────────────────
+// Compiled matcher index (exact map / prefix trie / combined regex)
+// ──────────────────────────────────────────────────────────────────────────────
+describe('brew_categories.py — compiled matcher index', () => {
+  test('earlier category wins across different rule kinds', () => {
+    const manifest = {
+      formulae: [
+        { id: 'regex-first', title: 'Regex First', match: { regex: ['^node'] } },
+        { id: 'prefix-second', title: 'Prefix Second', match: { prefix: ['no', 'py'] } },
+        { id: 'exact-third', title: 'Exact Third', match: { exact: ['node', 'python', 'pyenv'] } },
+      ],
+    };
+    withTempManifest(manifest, (manifestPath) => {
+      const result = runScript(
+        ['--manifest', manifestPath, '--type', 'formulae', '--format', 'brew'],
+        'python\nnode\nnoti\npyenv\n',
+      );
+      expect(result.status).toBe(0);
+      expect(result.stdout).toBe(
+        [
+          '# Regex First',
+          'brew "node"',
+          '',
+          '# Prefix Second',
+          'brew "python"',
+          'brew "noti"',
+          'brew "pyenv"',
+          '',
+          '',
+        ].join('\n'),
+      );
+    });
+  });
+
+  test('shorter prefix of an earlier category beats a longer prefix of a later one', () => {
+    const manifest = {
+      formulae: [
+        { id: 'short', title: 'Short', match: { prefix: ['lu'] } },
+        { id: 'long', title: 'Long', match: { prefix: ['luarocks'] } },
+      ],
+    };
+    withTempManifest(manifest, (manifestPath) => {
+      const result = runScript(['--manifest', manifestPath, '--type', 'formulae', '--format', 'brew'], 'luarocks\n');
+      expect(result.status).toBe(0);
+      expect(result.stdout).toContain('# Short');
+      expect(result.stdout).not.toContain('# Long');
+    });
+  });
+
+  test('regex lists with groups, backreferences and inline flags keep their meaning', () => {
+    const manifest = {
+      formulae: [
+        { id: 'repeat', title: 'Repeat', match: { regex: ['^(ab)\\1$', 'zz'] } },
+        { id: 'flags', title: 'Flags', match: { regex: ['(?i)^QT', '^x$'] } },
+      ],
+    };
+    withTempManifest(manifest, (manifestPath) => {
+      const result = runScript(
+        ['--manifest', manifestPath, '--type', 'formulae', '--format', 'brew'],
+        'abab\nab\nqtbase\n',
+      );
+      expect(result.status).toBe(0);
+      expect(result.stdout).toContain('# Repeat\nbrew "abab"\n');
+      expect(result.stdout).toContain('# Flags\nbrew "qtbase"\n');
+      expect(result.stdout).toContain('# Uncategorized\nbrew "ab"\n');
+    });
+  });
+});
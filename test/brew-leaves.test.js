@@ -0,0 +1,154 @@
+'use strict';
+
+/**
+ * Tests for script/lib/brew_leaves.py
+ *
+ * Feeds a `brew info --json=v2 --installed` fixture through the CLI:
+ *  - Formula leaves (runtime deps, declared-deps fallback, cask formula deps)
+ *  - Cask leaves (depends_on.cask, full tokens)
+ *  - Reading the dump from --input instead of stdin
+ *  - Categorizing leaves with --manifest
+ *  - Invalid JSON / missing dump exits non-zero
+ */
+
+const fs = require('fs');
+const path = require('path');
+const { spawnSync } = require('child_process');
+
+const repoPath = path.resolve(__dirname, '..');
+const scriptPath = path.join(repoPath, 'script', 'lib', 'brew_leaves.py');
+const contextDir = path.join(repoPath, '.context');
+const cacheHome = path.join(contextDir, 'brew-leaves-test-cache');
+
+const BREW_INFO = {
+  formulae: [
+    {
+      name: 'git',
+      full_name: 'git',
+      aliases: [],
+      dependencies: ['gettext', 'pcre2'],
+      installed: [{ runtime_dependencies: [{ full_name: 'gettext' }, { full_name: 'pcre2' }] }],
+    },
+    { name: 'gettext', full_name: 'gettext', dependencies: [], installed: [{ runtime_dependencies: [] }] },
+    { name: 'pcre2', full_name: 'pcre2', dependencies: [], installed: [{ runtime_dependencies: [] }] },
+    {
+      name: 'legacy',
+      full_name: 'legacy',
+      dependencies: ['openssl'],
+      installed: [{ runtime_dependencies: null }],
+    },
+    { name: 'openssl@3', full_name: 'openssl@3', aliases: ['openssl'], dependencies: [], installed: [{}] },
+    { name: 'mas', full_name: 'mas', dependencies: [], installed: [{ runtime_dependencies: [] }] },
+    { name: 'tool', full_name: 'me/tap/tool', dependencies: [], installed: [{ runtime_dependencies: [] }] },
+  ],
+  casks: [
+    { token: 'firefox', full_token: 'firefox', depends_on: {} },
+    { token: 'java-runtime', full_token: 'java-runtime', depends_on: {} },
+    { token: 'ide', full_token: 'ide', depends_on: { cask: ['java-runtime'], formula: ['mas'] } },
+    { token: 'plugin', full_token: 'me/tap/plugin', depends_on: {} },
+    { token: 'host', full_token: 'host', depends_on: { cask: ['me/tap/plugin'] } },
+  ],
+};
+
+/**
+ * Run brew_leaves.py with the given args and stdin input.
+ * @param {string[]} args
+ * @param {string} [stdin]
+ * @returns {{ status: number, stdout: string, stderr: string }}
+ */
+function runScript(args, stdin = JSON.stringify(BREW_INFO)) {
+  const result = spawnSync('python3', [scriptPath, ...args], {
+    cwd: repoPath,
+    input: stdin,
+    encoding: 'utf8',
+    env: { ...process.env, XDG_CACHE_HOME: cacheHome },
+    timeout: 10000,
+  });
+  return {
+    status: result.status ?? 1,
+    stdout: result.stdout ?? '',
+    stderr: result.stderr ?? '',
+  };
+}
+
+/**
+ * Write a temporary file under .context/ and invoke callback.
+ * The file is removed after the callback returns.
+ * @param {string} name
+ * @param {string} content
+ * @param {(filePath: string) => void} callback
+ */
+function withTempFile(name, content, callback) {
+  fs.mkdirSync(contextDir, { recursive: true });
+  const filePath = path.join(contextDir, name);
+  try {
+    fs.writeFileSync(filePath, content);
+    callback(filePath);
+  } finally {
+    fs.rmSync(filePath, { force: true });
+  }
+}
+
+afterAll(() => {
+  fs.rmSync(cacheHome, { recursive: true, force: true });
+});
+
+describe('brew_leaves.py — leaf detection', () => {
+  test('formula leaves exclude runtime, declared and cask formula dependencies', () => {
+    const result = runScript(['--type', 'formulae']);
+    expect(result.status).toBe(0);
+    expect(result.stdout).toBe('git\nlegacy\nme/tap/tool\n');
+  });
+
+  test('cask leaves exclude casks another installed cask depends on', () => {
+    const result = runScript(['--type', 'casks']);
+    expect(result.status).toBe(0);
+    expect(result.stdout).toBe('firefox\nhost\nide\n');
+  });
+
+  test('reads the dump from --input', () => {
+    withTempFile('brew-leaves-test-info.json', JSON.stringify(BREW_INFO), (infoPath) => {
+      const result = runScript(['--type', 'casks', '--input', infoPath], '');
+      expect(result.status).toBe(0);
+      expect(result.stdout).toBe('firefox\nhost\nide\n');
+    });
+  });
+
+  test('empty dump produces no output', () => {
+    const result = runScript(['--type', 'formulae'], '{}');
+    expect(result.status).toBe(0);
+    expect(result.stdout).toBe('');
+  });
+
+  test('invalid JSON exits non-zero', () => {
+    const result = runScript(['--type', 'formulae'], 'not json');
+    expect(result.status).not.toBe(0);
+    expect(result.stderr).toContain('Invalid brew info JSON');
+  });
+
+  test('missing --input file exits non-zero', () => {
+    const result = runScript(['--type', 'formulae', '--input', '/nonexistent/info.json'], '');
+    expect(result.status).not.toBe(0);
+  });
+});
+
+describe('brew_leaves.py — categorized output', () => {
+  test('--manifest feeds leaves into categorize', () => {
+    const manifest = { casks: [{ id: 'browsers', title: 'Browsers', match: { exact: ['firefox'] } }] };
+    withTempFile('brew-leaves-test-manifest.json', JSON.stringify(manifest), (manifestPath) => {
+      const result = runScript(['--type', 'casks', '--manifest', manifestPath, '--format', 'brew']);
+      expect(result.status).toBe(0);
+      expect(result.stdout).toBe('# Browsers\ncask "firefox"\n\n# Uncategorized\ncask "host"\ncask "ide"\n\n');
+    });
+  });
+
+  test('human format honours --label-uncategorized', () => {
+    const manifest = { formulae: [{ id: 'vcs', title: 'VCS', match: { exact: ['git'] } }] };
+    withTempFile('brew-leaves-test-manifest.json', JSON.stringify(manifest), (manifestPath) => {
+      const result = runScript(['--type', 'formulae', '--manifest', manifestPath, '--label-uncategorized']);
+      expect(result.status).toBe(0);
+      expect(result.stdout).toContain('=== VCS ===\ngit\n');
+      expect(result.stdout).toContain('=== Uncategorized ===\nlegacy\nme/tap/tool\n');
+    });
+  });
+});
@@ -0,0 +1,269 @@
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const { spawnSync } = require('child_process');
+const { SCRIPT_PATH, makeTempDir, makeTempRepo, runMerge, readToml } = require('./helpers/codex-config-merge');
+
+// Multi-target batch mode and the <target>.merge-stamp fast path of
+// script/codex-config-merge.py.
+
+// Shadows the stdlib tomllib for the fast-path tests: any attempt to parse
+// proves the merge did not short-circuit on the stamp.
+const TOMLLIB_FORBIDDEN = `
+class TOMLDecodeError(ValueError):
+    pass
+
+
+def loads(s, **kwargs):
+    raise SystemExit("tomllib.loads called on the fast path")
+
+
+load = loads
+`;
+
+// Runs the script in-process for the given argv and prints which of the slow
+// path's heavy modules ended up imported (exec rather than runpy, which itself
+// pulls in typing).
+const REPORT_HEAVY_IMPORTS = `
+import json
+import sys
+
+script, *args = sys.argv[1:]
+sys.argv = [script, *args]
+with open(script) as fh:
+    code = compile(fh.read(), script, "exec")
+try:
+    exec(code, {"__name__": "__main__", "__file__": script})
+except SystemExit:
+    pass
+heavy = ("argparse", "concurrent.futures", "datetime", "resource", "threading", "tomllib", "typing")
+print(json.dumps([name for name in heavy if name in sys.modules]))
+`;
+
+describe('script/codex-config-merge.py --batch', () => {
+  function runBatch(args) {
+    const result = runMerge(['--batch', ...args]);
+    return { ...result, summary: result.stdout ? JSON.parse(result.stdout) : null };
+  }
+
+  test('merges every target from arguments and a targets file, reporting each status', () => {
+    const repo = makeTempRepo();
+    try {
+      const basePath = path.join(repo, 'base.toml');
+      fs.writeFileSync(basePath, '[a]\nvalue = "base"\n');
+
+      const fresh = path.join(repo, 'fresh.toml');
+      const existing = path.join(repo, 'existing.toml');
+      fs.writeFileSync(existing, '[a]\nvalue = "old"\nlocal_only = "keep-me"\n');
+      const upToDate = path.join(repo, 'up-to-date.toml');
+      const linkedFile = path.join(repo, 'linked-source.toml');
+      fs.writeFileSync(linkedFile, '[a]\nlocal_only = "from-symlink"\n');
+      const linked = path.join(repo, 'linked.toml');
+      fs.symlinkSync(linkedFile, linked);
+
+      // Seed the up-to-date target with the script's own output so it is byte-identical
+      expect(runMerge([basePath, upToDate]).status).toBe(0);
+
+      const targetsFile = path.join(repo, 'targets.txt');
+      fs.writeFileSync(targetsFile, `# fleet\n${upToDate}\n\n${linked}\n${fresh}\n`);
+
+      const result = runBatch([basePath, fresh, existing, '--targets-file', targetsFile, '--jobs', '2']);
+
+      expect(result.status).toBe(0);
+      expect(result.summary.base).toBe(basePath);
+      expect(result.summary.results).toEqual([
+        { target: fresh, status: 'merged' },
+        { target: existing, status: 'merged' },
+        { target: upToDate, status: 'unchanged' },
+        { target: linked, status: 'migrated' },
+      ]);
+      expect(readToml(existing)).toEqual({ a: { value: 'base', local_only: 'keep-me' } });
+      expect(fs.lstatSync(linked).isSymbolicLink()).toBe(false);
+      expect(readToml(linked)).toEqual({ a: { value: 'base', local_only: 'from-symlink' } });
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+
+  test('a corrupt target is reported as an error without stopping the others', () => {
+    const repo = makeTempRepo();
+    try {
+      const basePath = path.join(repo, 'base.toml');
+      fs.writeFileSync(basePath, '[a]\nvalue = "base"\n');
+      const corruptPath = path.join(repo, 'corrupt.toml');
+      const corrupted = 'this is not [ valid toml';
+      fs.writeFileSync(corruptPath, corrupted);
+      const goodPath = path.join(repo, 'good.toml');
+
+      const result = runBatch([basePath, corruptPath, goodPath]);
+
+      expect(result.status).toBe(1);
+      const [corrupt, good] = result.summary.results;
+      expect(corrupt.status).toBe('error');
+      expect(corrupt.error).toContain('配備先の TOML が不正です');
+      expect(good).toEqual({ target: goodPath, status: 'merged' });
+      expect(fs.readFileSync(corruptPath, 'utf8')).toBe(corrupted);
+      expect(readToml(goodPath)).toEqual({ a: { value: 'base' } });
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+
+  test('merges each file once however it is spelled, with per-file temp names', () => {
+    const repo = makeTempRepo();
+    try {
+      const basePath = path.join(repo, 'base.toml');
+      fs.writeFileSync(basePath, '[a]\nvalue = "base"\n');
+      const home = path.join(repo, 'home');
+      fs.mkdirSync(home);
+      const linkedHome = path.join(repo, 'linked-home');
+      fs.symlinkSync(home, linkedHome);
+      const target = path.join(home, 'config.toml');
+      const sibling = path.join(home, 'config.json');
+      fs.writeFileSync(sibling, 'local = "json"\n');
+
+      const result = runBatch([
+        basePath,
+        target,
+        path.relative(process.cwd(), target),
+        path.join(linkedHome, 'config.toml'),
+        sibling,
+      ]);
+
+      expect(result.status).toBe(0);
+      expect(result.summary.results).toEqual([
+        { target, status: 'merged' },
+        { target: sibling, status: 'merged' },
+      ]);
+      expect(readToml(target)).toEqual({ a: { value: 'base' } });
+      expect(readToml(sibling)).toEqual({ local: 'json', a: { value: 'base' } });
+      expect(fs.readdirSync(home).filter((name) => name.endsWith('.tmp'))).toEqual([]);
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+
+  test('exits 1 without a summary when the base cannot be read', () => {
+    const repo = makeTempRepo();
+    try {
+      const result = runBatch([path.join(repo, 'missing-base.toml'), path.join(repo, 'target.toml')]);
+      expect(result.status).toBe(1);
+      expect(result.stderr).toContain('ベースを読めません');
+      expect(result.stdout).toBe('');
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+
+  test('exits 2 when no targets are given', () => {
+    const repo = makeTempRepo();
+    try {
+      const basePath = path.join(repo, 'base.toml');
+      fs.writeFileSync(basePath, '[a]\nvalue = "base"\n');
+      expect(runMerge(['--batch', basePath]).status).toBe(2);
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+});
+
+describe('script/codex-config-merge.py stamp fast path', () => {
+  let forbiddenStubDir;
+
+  beforeAll(() => {
+    forbiddenStubDir = makeTempDir('codex-merge-forbidden-stub-', { 'tomllib.py': TOMLLIB_FORBIDDEN });
+  });
+
+  afterAll(() => {
+    fs.rmSync(forbiddenStubDir, { recursive: true, force: true });
+  });
+
+  function setup(repo) {
+    const basePath = path.join(repo, 'base.toml');
+    const targetPath = path.join(repo, 'config.toml');
+    fs.writeFileSync(basePath, '[a]\nvalue = "base"\n');
+    fs.writeFileSync(targetPath, '[a]\nlocal_only = "keep-me"\n');
+    expect(runMerge([basePath, targetPath]).status).toBe(0);
+    return { basePath, targetPath, stampPath: `${targetPath}.merge-stamp` };
+  }
+
+  test('records base, target and output hashes after a merge', () => {
+    const repo = makeTempRepo();
+    try {
+      const { stampPath } = setup(repo);
+      const stamp = JSON.parse(fs.readFileSync(stampPath, 'utf8'));
+      expect(stamp.base).toMatch(/^[0-9a-f]{64}$/);
+      expect(stamp.target).toBe(stamp.output);
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+
+  test('skips parsing and serializing when neither file changed', () => {
+    const repo = makeTempRepo();
+    try {
+      const { basePath, targetPath } = setup(repo);
+      const before = fs.readFileSync(targetPath, 'utf8');
+
+      const result = runMerge([basePath, targetPath], forbiddenStubDir);
+
+      expect(result.status).toBe(0);
+      expect(result.stdout).toBe('');
+      expect(fs.readFileSync(targetPath, 'utf8')).toBe(before);
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+
+  test('imports none of the merge-only modules when neither file changed', () => {
+    const repo = makeTempRepo();
+    try {
+      const { basePath, targetPath } = setup(repo);
+      const result = spawnSync('python3', ['-c', REPORT_HEAVY_IMPORTS, SCRIPT_PATH, basePath, targetPath], {
+        encoding: 'utf8',
+      });
+
+      expect(result.status).toBe(0);
+      expect(JSON.parse(result.stdout)).toEqual([]);
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+
+  test('re-merges when the target was touched after the last merge', () => {
+    const repo = makeTempRepo();
+    try {
+      const { basePath, targetPath } = setup(repo);
+      fs.appendFileSync(targetPath, '\n[projects.work]\ntrust_level = "trusted"\n');
+
+      expect(runMerge([basePath, targetPath], forbiddenStubDir).status).not.toBe(0);
+      const result = runMerge([basePath, targetPath]);
+
+      expect(result.status).toBe(0);
+      expect(readToml(targetPath)).toEqual({
+        a: { value: 'base', local_only: 'keep-me' },
+        projects: { work: { trust_level: 'trusted' } },
+      });
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+
+  test('re-merges when the base changed, and ignores a corrupt stamp', () => {
+    const repo = makeTempRepo();
+    try {
+      const { basePath, targetPath, stampPath } = setup(repo);
+      fs.writeFileSync(basePath, '[a]\nvalue = "base-v2"\n');
+      expect(runMerge([basePath, targetPath]).stdout).toContain('マージ配備しました');
+      expect(readToml(targetPath).a.value).toBe('base-v2');
+
+      fs.writeFileSync(stampPath, 'not json');
+      const result = runMerge([basePath, targetPath]);
+      expect(result.status).toBe(0);
+      expect(JSON.parse(fs.readFileSync(stampPath, 'utf8')).format).toBe(1);
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
+});
@@ -0,0 +1,139 @@
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const { makeTempRepo, runMerge, readToml } = require('./helpers/codex-config-merge');
+
+// Minimal-diff patching of an existing target by script/codex-config-merge.py:
+// only the keys that differ from the merge result are rewritten or inserted.
+
+describe('script/codex-config-merge.py in-place patching', () => {
+  let repo;
+
+  beforeEach(() => {
+    repo = makeTempRepo();
+  });
+
+  afterEach(() => {
+    fs.rmSync(repo, { recursive: true, force: true });
+  });
+
+  function merge(base, local) {
+    const basePath = path.join(repo, 'base.toml');
+    const targetPath = path.join(repo, 'config.toml');
+    fs.writeFileSync(basePath, base);
+    fs.writeFileSync(targetPath, local);
+    const result = runMerge([basePath, targetPath]);
+    expect(result.status).toBe(0);
+    return { targetPath, text: fs.readFileSync(targetPath, 'utf8') };
+  }
+
+  test('rewrites only the changed values, keeping comments and formatting', () => {
+    const { text } = merge(
+      'model = "gpt-5"\n\n[tools]\nweb_search = true\n',
+      [
+        '# personal settings',
+        'model = "o3"   # overridden by the base',
+        'notify = ["say",  "done"]',
+        '',
+        '[tools]',
+        'web_search  =  false # keep this comment',
+        '',
+        '[projects."/work"]',
+        'trust_level = "trusted"',
+        '',
+      ].join('\n'),
+    );
+
+    expect(text).toBe(
+      [
+        '# personal settings',
+        'model = "gpt-5"   # overridden by the base',
+        'notify = ["say",  "done"]',
+        '',
+        '[tools]',
+        'web_search  =  true # keep this comment',
+        '',
+        '[projects."/work"]',
+        'trust_level = "trusted"',
+        '',
+      ].join('\n'),
+    );
+  });
+
+  test('does not rewrite a target whose values already match the merge result', () => {
+    const local = '# already merged\n[tools]\nweb_search=true   # odd spacing\n';
+    const { targetPath, text } = merge('[tools]\nweb_search = true\n', local);
+
+    expect(text).toBe(local);
+    // A second run is answered from the stamp without touching the file either
+    const second = runMerge([path.join(repo, 'base.toml'), targetPath]);
+    expect(second).toMatchObject({ status: 0, stdout: '' });
+    expect(fs.readFileSync(targetPath, 'utf8')).toBe(local);
+  });
+
+  test('adds new keys to their existing section and new tables at the end', () => {
+    const { targetPath, text } = merge(
+      'approval_policy = "never"\n\n[tools]\nweb_search = true\n\n[mcp_servers.docs]\ncommand = "docs-mcp"\n',
+      '# root comment\nmodel = "o3"\n\n[tools]\nview_image = true\n\n[history]\npersistence = "none"\n',
+    );
+
+    expect(text).toBe(
+      [
+        '# root comment',
+        'model = "o3"',
+        'approval_policy = "never"',
+        '',
+        '[tools]',
+        'view_image = true',
+        'web_search = true',
+        '',
+        '[history]',
+        'persistence = "none"',
+        '',
+        '[mcp_servers.docs]',
+        'command = "docs-mcp"',
+        '',
+      ].join('\n'),
+    );
+    expect(readToml(targetPath)).toEqual({
+      model: 'o3',
+      approval_policy: 'never',
+      tools: { view_image: true, web_search: true },
+      history: { persistence: 'none' },
+      mcp_servers: { docs: { command: 'docs-mcp' } },
+    });
+  });
+
+  test('replaces values inside inline tables and dotted keys as a whole value', () => {
+    const { targetPath, text } = merge(
+      '[mcp_servers.docs]\nargs = ["--fast"]\n\n[shell]\nenv.PATH = "/usr/bin"\n',
+      'mcp_servers = { docs = { command = "docs", args = [] } } # inline\n\n[shell]\nenv.PATH = "/bin" # dotted\n',
+    );
+
+    expect(text).toBe(
+      'mcp_servers = { docs = { command = "docs", args = [\n    "--fast",\n] } } # inline\n\n[shell]\nenv.PATH = "/usr/bin" # dotted\n',
+    );
+    expect(readToml(targetPath)).toEqual({
+      mcp_servers: { docs: { command: 'docs', args: ['--fast'] } },
+      shell: { env: { PATH: '/usr/bin' } },
+    });
+  });
+
+  test('treats a change of type as a change even when the values compare equal', () => {
+    const { targetPath, text } = merge('retries = 1\n', 'retries = true # bool\n');
+
+    expect(text).toBe('retries = 1 # bool\n');
+    expect(readToml(targetPath)).toEqual({ retries: 1 });
+  });
+
+  test('falls back to a full reserialization when a table array has to be replaced', () => {
+    const { targetPath, text } = merge(
+      'profiles = "flat"\n',
+      '# dropped by the fallback\n[[profiles]]\nname = "a"\n',
+    );
+
+    expect(text).toBe('profiles = "flat"\n');
+    expect(readToml(targetPath)).toEqual({ profiles: 'flat' });
+  });
+});
@@ -0,0 +1,110 @@
+'use strict';
+
+const path = require('path');
+const { spawnSync } = require('child_process');
+const { SCRIPT_PATH, REPO_CODEX_CONFIG } = require('./helpers/codex-config-merge');
+
+// Serializes the repo config and synthetic large configs with the script's
+// dumps_toml and checks the tomllib round trip. Byte-for-byte compatibility
+// with tomli_w is pinned by golden files holding tomli_w.dumps output (for a
+// snapshot of the repo config and for synthetic-50), so it is checked even
+// where tomli_w is not installed. Regenerate them with tomli_w importable:
+//   UPDATE_TOMLI_W_GOLDEN=1 npx jest test/codex-config-merge-writer.test.js
+const FIXTURES_DIR = path.join(__dirname, 'fixtures', 'codex-config-merge');
+const HAS_TOMLI_W = spawnSync('python3', ['-c', 'import tomli_w']).status === 0;
+
+const CHECK_WRITER = `
+import datetime as dt
+import importlib.util
+import json
+import os
+import sys
+import tomllib
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location("codex_config_merge", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+fixtures = Path(sys.argv[3])
+
+try:
+    import tomli_w
+except ImportError:
+    tomli_w = None
+
+
+def synthetic(size):
+    jst = dt.timezone(dt.timedelta(hours=9))
+    return {
+        "model": "gpt",
+        "ratio": 0.25,
+        "updated_at": dt.datetime(2026, 1, 2, 3, 4, 5, tzinfo=jst),
+        "notify": ["/usr/local/bin/notify", "--flag"],
+        "projects": {f"/Users/dev/repo-{i}": {"trust_level": "trusted"} for i in range(size)},
+        "mcp_servers": {
+            f"server-{i}": {
+                "command": "npx",
+                "args": ["-y", f"pkg-{i}@latest", "quote " + chr(34) + " and " + chr(92) + " backslash"],
+                "startup_timeout_sec": i,
+                "enabled": i % 2 == 0,
+                "env": {"TOKEN": "$" + f"{{TOKEN_{i}}}", "TAB": "a" + chr(9) + "b", "CTRL": "x" + chr(1) + chr(10)},
+                "tools": [{"name": f"t{j}", "on": True} for j in range(2)],
+                "hooks": [{"name": f"h{j}", "description": "long " * 30} for j in range(2)],
+            }
+            for i in range(size)
+        },
+        "nested": {"a": {"b": {"c": {"d": [[1, 2], [], ["x"]], "when": dt.date(2026, 5, 6), "at": dt.time(7, 8)}}}},
+    }
+
+
+with open(sys.argv[2], "rb") as fh:
+    cases = [("repo", tomllib.load(fh))] + [(f"synthetic-{n}", synthetic(n)) for n in (1, 50, 2000)]
+
+golden = {
+    "repo-config": tomllib.loads((fixtures / "repo-config.toml").read_text()),
+    "synthetic-50": synthetic(50),
+}
+if os.environ.get("UPDATE_TOMLI_W_GOLDEN"):
+    for name, data in golden.items():
+        (fixtures / f"{name}.tomli_w.toml").write_bytes(tomli_w.dumps(data).encode())
+
+report = {"round_trip": [], "golden_mismatch": [], "mismatch": []}
+for name, data in cases:
+    output = module.dumps_toml(data)
+    if tomllib.loads(output) == data:
+        report["round_trip"].append(name)
+    if tomli_w is not None and output != tomli_w.dumps(data):
+        report["mismatch"].append(name)
+for name, data in golden.items():
+    expected = (fixtures / f"{name}.tomli_w.toml").read_bytes().decode()
+    if module.dumps_toml(data) != expected:
+        report["golden_mismatch"].append(name)
+print(json.dumps(report))
+`;
+
+describe('script/codex-config-merge.py built-in TOML writer', () => {
+  let report;
+
+  beforeAll(() => {
+    const result = spawnSync('python3', ['-c', CHECK_WRITER, SCRIPT_PATH, REPO_CODEX_CONFIG, FIXTURES_DIR], {
+      encoding: 'utf8',
+      timeout: 60000,
+    });
+    if (result.status !== 0) {
+      throw new Error(`writer check failed: ${result.stderr}`);
+    }
+    report = JSON.parse(result.stdout);
+  });
+
+  test('round-trips the repo config and synthetic large configs through tomllib', () => {
+    expect(report.round_trip).toEqual(['repo', 'synthetic-1', 'synthetic-50', 'synthetic-2000']);
+  });
+
+  test('output is byte-identical to the recorded tomli_w golden files', () => {
+    expect(report.golden_mismatch).toEqual([]);
+  });
+
+  (HAS_TOMLI_W ? test : test.skip)('output is byte-identical to the installed tomli_w', () => {
+    expect(report.mismatch).toEqual([]);
+  });
+});
@@ -2,95 +2,24 @@
 
 const fs = require('fs');
 const path = require('path');
-const { spawnSync } = require('child_process');
+const { SCRIPT_PATH, makeTempRepo, runMerge, readToml } = require('./helpers/codex-config-merge');
 
 // script/codex-config-merge.py deep-merges the repo's shared .codex/config.toml
 // into the terminal-local ~/.codex/config.toml, letting the base win on shared
-// keys while preserving terminal-only state (see docs/adr/0022). It normally
-// runs via `uv run --script`, which auto-installs its declared `tomli_w`
-// dependency. This environment has neither `uv` nor `tomli_w` installed, so
-// these tests inject a minimal `tomli_w` shim onto PYTHONPATH — good enough to
-// serialize the plain string/bool/nested-table values used below — letting us
-// exercise the script's real control flow (script/codex-config-merge.py)
-// without requiring network access or a pip install.
-const SCRIPT_PATH = path.join(__dirname, '../script/codex-config-merge.py');
-const CONTEXT_DIR = path.join(__dirname, '../.context');
-
-const TOMLI_W_SHIM = `
-def dumps(data):
-    lines = []
-    _write_table(data, [], lines)
-    return "\\n".join(lines) + "\\n"
-
-
-def _write_table(table, path_parts, lines):
-    scalars = {k: v for k, v in table.items() if not isinstance(v, dict)}
-    tables = {k: v for k, v in table.items() if isinstance(v, dict)}
-    if path_parts:
-        lines.append("[" + ".".join(path_parts) + "]")
-    for k, v in scalars.items():
-        lines.append(f"{k} = {_format(v)}")
-    for k, v in tables.items():
-        _write_table(v, path_parts + [k], lines)
-
-
-def _format(v):
-    if isinstance(v, bool):
-        return "true" if v else "false"
-    if isinstance(v, int):
-        return str(v)
-    if isinstance(v, str):
-        escaped = v.replace("\\\\", "\\\\\\\\").replace('"', '\\\\"')
-        return f'"{escaped}"'
-    raise TypeError(f"unsupported type in test shim: {type(v)}")
-`;
-
-const READ_TOML_AS_JSON = `
-import json
-import sys
-import tomllib
-
-with open(sys.argv[1], "rb") as fh:
-    print(json.dumps(tomllib.load(fh)))
-`;
+// keys while preserving terminal-only state (see docs/adr/0022). It only needs
+// the Python 3.11+ standard library: TOML is written by a built-in serializer
+// whose output matches `tomli_w`. The serializer tests compare against
+// `tomli_w` golden files in test/fixtures/codex-config-merge/, and against a
+// live `tomli_w` when it is importable.
 
 describe('script/codex-config-merge.py', () => {
-  let stubDir;
-  let readTomlScript;
-
-  beforeAll(() => {
-    fs.mkdirSync(CONTEXT_DIR, { recursive: true });
-    stubDir = fs.mkdtempSync(path.join(CONTEXT_DIR, 'codex-merge-stub-'));
-    fs.writeFileSync(path.join(stubDir, 'tomli_w.py'), TOMLI_W_SHIM);
-    readTomlScript = path.join(stubDir, 'read_toml_as_json.py');
-    fs.writeFileSync(readTomlScript, READ_TOML_AS_JSON);
+  test('runs under plain python3 with only standard-library imports', () => {
+    const content = fs.readFileSync(SCRIPT_PATH, 'utf8');
+    expect(content.startsWith('#!/usr/bin/env python3')).toBe(true);
+    expect(content).toContain('# dependencies = []');
+    expect(content).not.toMatch(/^import tomli_w/m);
   });
 
-  afterAll(() => {
-    fs.rmSync(stubDir, { recursive: true, force: true });
-  });
-
-  function makeTempRepo() {
-    return fs.mkdtempSync(path.join(CONTEXT_DIR, 'codex-merge-repo-'));
-  }
-
-  function runMerge(args) {
-    const result = spawnSync('python3', [SCRIPT_PATH, ...args], {
-      encoding: 'utf8',
-      env: { ...process.env, PYTHONPATH: stubDir },
-      timeout: 15000,
-    });
-    return { status: result.status, stdout: result.stdout ?? '', stderr: result.stderr ?? '' };
-  }
-
-  function readToml(filePath) {
-    const result = spawnSync('python3', [readTomlScript, filePath], { encoding: 'utf8' });
-    if (result.status !== 0) {
-      throw new Error(`failed to read TOML ${filePath}: ${result.stderr}`);
-    }
-    return JSON.parse(result.stdout);
-  }
-
   test('exits with usage error when arguments are missing', () => {
     const result = runMerge([]);
     expect(result.status).toBe(2);
@@ -186,4 +115,29 @@ describe('script/codex-config-merge.py', () => {
       fs.rmSync(repo, { recursive: true, force: true });
     }
   });
+
+  test('--timings reports every merge phase as JSON on stderr', () => {
+    const repo = makeTempRepo();
+    try {
+      const basePath = path.join(repo, 'base.toml');
+      const targetPath = path.join(repo, 'config.toml');
+      fs.writeFileSync(basePath, '[a]\nvalue = "base"\n');
+
+      const result = runMerge(['--timings', basePath, targetPath]);
+
+      expect(result.status).toBe(0);
+      expect(result.stdout).toContain('ベースをマージ配備しました');
+      const report = JSON.parse(result.stderr.trim());
+      expect(report.tool).toBe('codex-config-merge');
+      expect(Object.keys(report.phases)).toEqual(['stamp', 'parse', 'deep_merge', 'serialize', 'write']);
+      for (const phase of Object.values(report.phases)) {
+        expect(phase.calls).toBe(1);
+        expect(phase.seconds).toBeGreaterThanOrEqual(0);
+        expect(phase.max_rss_bytes).toBeGreaterThan(0);
+      }
+      expect(readToml(targetPath)).toEqual({ a: { value: 'base' } });
+    } finally {
+      fs.rmSync(repo, { recursive: true, force: true });
+    }
+  });
 });
@@ -0,0 +1,50 @@
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const { spawnSync } = require('child_process');
+
+const repoPath = path.resolve(__dirname, '..', '..');
+const scriptPath = path.join(repoPath, 'script', 'lib', 'brew_categories.py');
+const contextDir = path.join(repoPath, '.context');
+const cacheHome = path.join(contextDir, 'brew-categories-test-cache');
+
+/**
+ * Run brew_categories.py with the given args and stdin input.
+ * @param {string[]} args
+ * @param {string} [stdin]
+ * @returns {{ status: number, stdout: string, stderr: string }}
+ */
+function runScript(args, stdin = '') {
+  const result = spawnSync('python3', [scriptPath, ...args], {
+    cwd: repoPath,
+    input: stdin,
+    encoding: 'utf8',
+    env: { ...process.env, XDG_CACHE_HOME: cacheHome },
+    timeout: 10000,
+  });
+  return {
+    status: result.status ?? 1,
+    stdout: result.stdout ?? '',
+    stderr: result.stderr ?? '',
+  };
+}
+
+/**
+ * Write a temporary manifest JSON file under .context/ and invoke callback.
+ * The file is removed after the callback returns.
+ * @param {object} categories - Object to serialize as JSON manifest
+ * @param {(manifestPath: string) => void} callback
+ */
+function withTempManifest(categories, callback) {
+  fs.mkdirSync(contextDir, { recursive: true });
+  const manifestPath = path.join(contextDir, 'brew-categories-test-manifest.json');
+  try {
+    fs.writeFileSync(manifestPath, JSON.stringify(categories));
+    callback(manifestPath);
+  } finally {
+    fs.rmSync(manifestPath, { force: true });
+  }
+}
+
+module.exports = { repoPath, scriptPath, contextDir, cacheHome, runScript, withTempManifest };
@@ -0,0 +1,63 @@
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const { spawnSync } = require('child_process');
+
+const repoPath = path.resolve(__dirname, '..', '..');
+const SCRIPT_PATH = path.join(repoPath, 'script', 'codex-config-merge.py');
+const CONTEXT_DIR = path.join(repoPath, '.context');
+const REPO_CODEX_CONFIG = path.join(repoPath, '.codex', 'config.toml');
+
+const READ_TOML_AS_JSON = `
+import json
+import sys
+import tomllib
+
+with open(sys.argv[1], "rb") as fh:
+    print(json.dumps(tomllib.load(fh)))
+`;
+
+/**
+ * .context/ 配下に一時ディレクトリを作る（呼び出し側で削除する）。
+ * @param {string} prefix - ディレクトリ名の接頭辞。
+ * @param {Record<string, string>} [files] - 配置するファイル名と内容。
+ * @returns {string} 作成したディレクトリのパス。
+ */
+function makeTempDir(prefix, files = {}) {
+  fs.mkdirSync(CONTEXT_DIR, { recursive: true });
+  const dir = fs.mkdtempSync(path.join(CONTEXT_DIR, prefix));
+  for (const [name, content] of Object.entries(files)) {
+    fs.writeFileSync(path.join(dir, name), content);
+  }
+  return dir;
+}
+
+function makeTempRepo() {
+  return makeTempDir('codex-merge-repo-');
+}
+
+/**
+ * codex-config-merge.py を実行する。
+ * @param {string[]} args - スクリプト引数。
+ * @param {string} [pythonPath] - 指定時は PYTHONPATH に設定する（標準モジュールの差し替え用）。
+ * @returns {{status: number, stdout: string, stderr: string}}
+ */
+function runMerge(args, pythonPath) {
+  const result = spawnSync('python3', [SCRIPT_PATH, ...args], {
+    encoding: 'utf8',
+    env: pythonPath ? { ...process.env, PYTHONPATH: pythonPath } : process.env,
+    timeout: 15000,
+  });
+  return { status: result.status, stdout: result.stdout ?? '', stderr: result.stderr ?? '' };
+}
+
+function readToml(filePath) {
+  const result = spawnSync('python3', ['-c', READ_TOML_AS_JSON, filePath], { encoding: 'utf8' });
+  if (result.status !== 0) {
+    throw new Error(`failed to read TOML ${filePath}: ${result.stderr}`);
+  }
+  return JSON.parse(result.stdout);
+}
+
+module.exports = { SCRIPT_PATH, CONTEXT_DIR, REPO_CODEX_CONFIG, makeTempDir, makeTempRepo, runMerge, readToml };
@@ -0,0 +1,70 @@
+'use strict';
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { spawnSync } = require('child_process');
+
+// Regression gate for the hot paths of the Python helpers. script/bench-python-helpers.py
+// runs brew_categories.py and codex-config-merge.py with --timings on synthetic
+// inputs (thousands of manifest rules, 100k items, thousands of nested TOML
+// tables) and compares every phase with the recorded baseline. The timed check
+// takes several seconds and depends on the machine, so it only runs when
+// PYTHON_HELPERS_BENCH is set (`npm run test:bench`). Re-record the baseline with
+// `./script/bench-python-helpers.py --write-baseline` after an intended change.
+
+const repoPath = path.resolve(__dirname, '..');
+const BENCH_SCRIPT = path.join(repoPath, 'script', 'bench-python-helpers.py');
+const BASELINE_PATH = path.join(repoPath, '.context', 'python-helpers-bench-baseline.json');
+const RUN_BENCH = Boolean(process.env.PYTHON_HELPERS_BENCH);
+
+describe('script/bench-python-helpers.py', () => {
+  test('the baseline covers every phase of both helpers', () => {
+    const baseline = JSON.parse(fs.readFileSync(BASELINE_PATH, 'utf8'));
+
+    expect(baseline.tool).toBe('script/bench-python-helpers.py');
+    expect(baseline.scale.items).toBeGreaterThanOrEqual(100000);
+    expect(Object.keys(baseline.scenarios['categorize-human'].phases)).toEqual(['load', 'read', 'categorize', 'emit']);
+    expect(Object.keys(baseline.scenarios['merge-patch'].phases)).toEqual([
+      'stamp',
+      'parse',
+      'deep_merge',
+      'serialize',
+      'write',
+    ]);
+  });
+
+  test('--check skips without running when the baseline comes from another platform or Python', () => {
+    const baseline = JSON.parse(fs.readFileSync(BASELINE_PATH, 'utf8'));
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'python-helpers-bench-'));
+    try {
+      const foreign = path.join(dir, 'baseline.json');
+      fs.writeFileSync(foreign, JSON.stringify({ ...baseline, platform: 'other-os', python: '3.0' }));
+
+      const result = spawnSync('python3', [BENCH_SCRIPT, '--check', foreign], { encoding: 'utf8', timeout: 10000 });
+
+      expect(result.status).toBe(0);
+      expect(result.stdout).toBe('');
+      expect(result.stderr).toContain('skipped: baseline was recorded on other-os / Python 3.0');
+    } finally {
+      fs.rmSync(dir, { recursive: true, force: true });
+    }
+  });
+
+  (RUN_BENCH ? test : test.skip)('no phase regressed against the recorded baseline', () => {
+    const result = spawnSync('python3', [BENCH_SCRIPT, '--check', BASELINE_PATH, '--repeat', '1'], {
+      encoding: 'utf8',
+      timeout: 180000,
+    });
+
+    expect(result.stderr).not.toContain('regression:');
+    expect(result.status).toBe(0);
+    const report = JSON.parse(result.stdout);
+    expect(Object.keys(report.scenarios)).toEqual([
+      'categorize-human',
+      'categorize-jsonl',
+      'merge-fresh',
+      'merge-patch',
+    ]);
+  }, 240000);
+});